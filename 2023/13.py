@@ -1,11 +1,10 @@
-from common import do_part_on_input, logger
+from common import do_part_on_input, load_input, logger
 
 
 def find_mirrors(filename: str, smudges: int = 0):
-    patterns = open(filename).read().split("\n\n")
     res = 0
-    for pat in patterns:
-        rows = [line.rstrip() for line in pat.splitlines()]
+    for pat in load_input(filename).blocks:
+        rows = [line.rstrip() for line in pat]
         if top := mirror(rows, smudges):
             res += 100 * top
             show_mirror(rows, top, False)
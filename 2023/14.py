@@ -1,100 +1,113 @@
+from collections import Counter
 from collections.abc import Iterable
-
-from common import do_part_on_input, lines, logger
-
-DIRECTIONS = [-1, -1j, 1, 1j]
-
-
-def direction_dist(d: complex):
-    def f(x: complex):
-        return -d.real * x.real - d.imag * x.imag
-
-    return f
-
-
-def roll_cycles(filename: str, n: int = int(1e9)):
-    static_rocks, round_rocks, lc, cc = parse_rocks(filename)
-    mem = {}
-    for cycle in range(n):
-        for d in DIRECTIONS:
-            round_rocks = sorted(round_rocks, key=direction_dist(d))
-            round_rocks = roll(static_rocks, round_rocks, d, (lc, cc))
-        load = calc_load(lc, round_rocks)
-        logger.v(" ↑ Cycle", cycle + 1, load)
-        key = tuple(round_rocks)
-        if key in mem and ((n - cycle - 1) % (cycle - mem[key])) == 0:
-            break  # same state as after n
-        mem[key] = cycle
-    return load
-
-
-def show_rocks(static_rocks: set[complex], round_rocks: set[complex]):
-    imax = int(max(static_rocks | round_rocks, key=lambda x: x.real).real)
-    jmax = int(max(static_rocks | round_rocks, key=lambda x: x.imag).imag)
-    logger.m("【┌" + "─" * (jmax + 1) + "┐】")
-    for i in range(imax + 1):
-        line = "【│】"
-        for j in range(jmax + 1):
-            if i + j * 1j in static_rocks:
-                line += "■"
-                continue
-            if i + j * 1j in round_rocks:
-                line += "【●】"
+from itertools import chain
+
+from common import do_part_on_input, logger
+from common.cycles import find_cycle
+from common.grid import Grid
+
+STATIC = ord("#")
+ROUND = ord("O")
+
+# Segment counts per direction of the latest tilt, the rocks are packed at the
+# start of each segment so the counts are the whole state
+Counts = tuple[int, ...]
+
+
+class Platform:
+    """
+    Every line between static rocks is a segment, listed from the cell a rock
+    rolls to first. A tilt only has to count the rocks per segment of the new
+    direction and fill that many cells from the start, no rock walks.
+    """
+
+    def __init__(self, grid: Grid, directions: Iterable[int] = range(4)):
+        self.grid = grid
+        self.rocks = grid.find_all(ROUND)
+        for idx in self.rocks:
+            grid[idx] = "."
+        # North, west, south, east
+        self.offsets = (-grid.stride, -1, grid.stride, 1)
+        self.segments: dict[int, list[list[int]]] = {}
+        self.segment_of: dict[int, list[int]] = {}
+        for d in directions:
+            self.segments[d], self.segment_of[d] = self.find_segments(self.offsets[d])
+
+    def find_segments(self, o: int) -> tuple[list[list[int]], list[int]]:
+        grid = self.grid
+        segments: list[list[int]] = []
+        segment_of = [-1] * len(grid.data)
+        for idx in grid.indices():
+            if grid[idx] == STATIC or grid[idx + o] != STATIC:
                 continue
-            line += "."
-        logger.m(line + "【│】")
-    logger.m("【└" + "─" * (jmax + 1) + "┘】")
+            segment = []
+            while grid[idx] != STATIC:
+                segment_of[idx] = len(segments)
+                segment.append(idx)
+                idx -= o
+            segments.append(segment)
+        return segments, segment_of
+
+    def cells(self, d: int, counts: Counts) -> Iterable[int]:
+        return chain.from_iterable(s[:c] for s, c in zip(self.segments[d], counts) if c)
+
+    def tilt(self, d: int, rocks: Iterable[int]) -> Counts:
+        per_segment = Counter(map(self.segment_of[d].__getitem__, rocks))
+        return tuple(per_segment.get(s, 0) for s in range(len(self.segments[d])))
+
+    def spin(self, rocks: Iterable[int]) -> Counts:
+        """Tilt north, west, south and east, returning the counts for east"""
+        counts = self.tilt(0, rocks)
+        for d in range(1, 4):
+            counts = self.tilt(d, self.cells(d - 1, counts))
+        return counts
+
+    def load(self, rocks: Iterable[int]) -> int:
+        height, stride = self.grid.height, self.grid.stride
+        return sum(height + 1 - idx // stride for idx in rocks)
+
+    def show(self, rocks: Iterable[int]):
+        rock_set = set(rocks)
+        logger.m("【┌" + "─" * self.grid.width + "┐】")
+        for i in range(self.grid.height):
+            line = "【│】"
+            for j in range(self.grid.width):
+                idx = self.grid.idx((i, j))
+                if self.grid[idx] == STATIC:
+                    line += "■"
+                elif idx in rock_set:
+                    line += "【●】"
+                else:
+                    line += "."
+            logger.m(line + "【│】")
+        logger.m("【└" + "─" * self.grid.width + "┘】")
 
 
 def roll_north(filename: str):
-    static_rocks, round_rocks, lc, _ = parse_rocks(filename)
-    stopped_rocks = roll(static_rocks, round_rocks)
-    return calc_load(lc, stopped_rocks)
-
-
-def calc_load(lc: int, rocks: Iterable[complex]):
-    return int(sum(lc - p.real for p in rocks))
-
-
-def roll(
-    static_rocks: set[complex],
-    round_rocks: list[complex],
-    to: complex = -1,
-    limit: tuple[int, int] = (int(1e3), int(1e3)),
-) -> set[complex]:
-    stopped_rocks = set()
-    round_rocks.reverse()
-    while round_rocks:
-        p = round_rocks.pop() + to
-        while (
-            0 <= p.real < limit[0]
-            and 0 <= p.imag < limit[1]
-            and p not in static_rocks
-            and p not in stopped_rocks
-        ):
-            p += to
-        p -= to
-        stopped_rocks.add(p)
+    platform = Platform(Grid.from_input(filename, border=STATIC), directions=[0])
+    rocks = list(platform.cells(0, platform.tilt(0, platform.rocks)))
     if logger.level > 1:
-        show_rocks(static_rocks, stopped_rocks)
-    return stopped_rocks
+        platform.show(rocks)
+    return platform.load(rocks)
 
 
-def parse_rocks(filename):
-    static_rocks = set()
-    round_rocks = []
-    for i, line in enumerate(lines(filename)):
-        for j, ch in enumerate(line):
-            if ch == ".":
-                continue
-            if ch == "#":
-                static_rocks.add(i + j * 1j)
-                continue
-            if ch == "O":
-                round_rocks.append(i + j * 1j)
-    lc = i + 1
-    cc = j + 1
-    return static_rocks, round_rocks, lc, cc
+def roll_cycles(filename: str, n: int = int(1e9)):
+    platform = Platform(Grid.from_input(filename, border=STATIC))
+    i = 0
+
+    def spin(counts: Counts) -> Counts:
+        nonlocal i
+        counts = platform.spin(platform.cells(3, counts))
+        i += 1
+        if logger.is_verbose:
+            rocks = list(platform.cells(3, counts))
+            logger.v(" ↑ Cycle", i + 1, platform.load(rocks))
+            platform.show(rocks)
+        return counts
+
+    cycle = find_cycle(spin, platform.spin(platform.rocks))
+    logger.v(f"Cycle of {cycle.length} from {cycle.start + 1}")
+    return platform.load(platform.cells(3, cycle.fast_forward(n - 1)))
 
 
 def main():
@@ -1,68 +1,70 @@
-from heapq import heappop
+from common import do_part_on_input, logger
+from common.grid import Grid
+from common.search import dijkstra
 
-from common import do_part_on_input, lines, logger
+ZERO = ord("0")
 
 
-def turn(d: complex):
-    if d.real:
-        return (-1j, 1j)
-    if d.imag:
-        return (-1, 1)
-    raise ValueError("Why did we stop?")
+def crucible_djikstra(
+    filename: str, move_range: range = range(1, 4), astar: bool = False
+):
+    """
+    States are idx * 2 + axis, axis 1 if the crucible arrived moving along a
+    row, so the next move turns to the other axis. With astar, the Manhattan
+    distance to the target is a consistent heuristic since every block costs ≥ 1.
+    """
+    grid = Grid.from_input(filename)  # Border 0 is outside
+    data, stride = grid.data, grid.stride
+    steps = ((stride, -stride), (1, -1))  # Moves along each axis
+    start = grid.idx((0, 0))
+    target = grid.idx((grid.height - 1, grid.width - 1))
+    ti, tj = divmod(target, stride)
 
-
-def crucible_djikstra(filename: str, move_range: range = range(1, 4)):
-    blocks: dict[complex, int] = {
-        i + j * 1j: int(cost)
-        for i, line in enumerate(lines(filename))
-        for j, cost in enumerate(line.strip())
-    }
-    target = max(blocks, key=abs)
-    best = {}
-    states: list[tuple[int, int, complex, tuple[int, ...]]] = [
-        (0, 0, 1 + 0j, (0,)),
-        (0, 1, 1j, (0,)),
-    ]
-    i = 1  # insertion order (for heappop to behave on equal cost)
-    while states:
-        cost, _, delta, path = heappop(states)
-        pos = path[-1]
-
-        if pos == target:
-            if logger.level > 1:
-                show_path(path, target)
-            return cost
-
-        for d in turn(delta):
-            c, p = cost, path
+    def edges(state: int):
+        idx, axis = divmod(state, 2)
+        new_axis = 1 - axis
+        for d in steps[new_axis]:
+            nidx, cost = idx, 0
             for step in range(1, move_range.stop):
-                npos = p[-1] + d
-                if npos not in blocks:
+                nidx += d
+                if not data[nidx]:
                     break
-                p += (npos,)
-                c += blocks[npos]
-                i += 1
-                if step < move_range.start:
-                    continue
-                k = (npos, d)
-                if k not in best or c < best[k]:
-                    best[k] = c
-                    states.append((c, i, d * step, p))
+                cost += data[nidx] - ZERO
+                if step >= move_range.start:
+                    yield nidx * 2 + new_axis, cost
+
+    def heuristic(state: int) -> int:
+        i, j = divmod(state // 2, stride)
+        return ti - i + tj - j
 
-    return str(target)
+    res = dijkstra(
+        [start * 2, start * 2 + 1],
+        edges,
+        goal=lambda state: state // 2 == target,
+        heuristic=heuristic if astar else None,
+        parents=logger.level > 1,
+    )
+    if res.cost is None:
+        return str(grid.pos(target))
+    if logger.level > 1:
+        show_path(grid, [state // 2 for state in res.path()], target)
+    return res.cost
 
 
-def show_path(p: tuple[int, ...], tgt: complex):
-    ri = range(int(tgt.real) + 1)
-    rj = range(int(tgt.imag) + 1)
-    path = {(int(z.real), int(z.imag)) for z in p}
+def show_path(grid: Grid, turns: list[int], target: int):
+    path: set[int] = set()
+    for a, b in zip(turns, turns[1:]):
+        d = grid.stride if abs(b - a) >= grid.stride else 1
+        lo, hi = min(a, b), max(a, b)
+        path.update(range(lo, hi + 1, d))
     lines = []
-    for i in ri:
+    for i in range(grid.height):
         line = ""
-        for j in rj:
-            if i + j * 1j == tgt:
+        for j in range(grid.width):
+            idx = grid.idx((i, j))
+            if idx == target:
                 line += "【█】"
-            elif (i, j) in path:
+            elif idx in path:
                 line += "█"
             else:
                 line += "."
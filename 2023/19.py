@@ -1,18 +1,26 @@
 import re
+from bisect import bisect_right
+from collections import defaultdict
+from collections.abc import Sequence
 from dataclasses import dataclass
+from functools import cached_property
 from math import prod
-from operator import gt, lt
-from typing import Literal
+from typing import Literal, NamedTuple
 
-from common import do_part_on_input, logger
+from common import do_part_on_input, load_input, logger
+from common.intervals import Interval
 
-OP = {"<": lt, ">": gt}
+ATTRIBUTES = "xmas"
+LIMITS = (1, 4001)
+# Indexing the boxes costs ~1.6 ms and saves ~1 µs per part over walking workflows
+BULK_PARTS = 2000
 
 RE_DIGITS = re.compile(r"(\d+)")
 
+Box = tuple[Interval, ...]  # One [lo, hi) per attribute
 
-@dataclass
-class Part:
+
+class Part(NamedTuple):
     x: int
     m: int
     a: int
@@ -22,23 +30,34 @@ class Part:
     def from_str(cls, string):
         return cls(*map(int, RE_DIGITS.findall(string)))
 
-    def __getitem__(self, key):
-        return self.__getattribute__(key)
-
     @property
     def rating(self):
-        return self.x + self.m + self.a + self.s
+        return sum(self)
 
 
 @dataclass
 class Stage:
-    atr: str
+    atr: int
     op: Literal["<", ">"]
     ref: int
     out: str
 
-    def apply(self, part: Part):
-        return self.out if OP[self.op](part[self.atr], self.ref) else None
+    def sends(self, part: Part) -> bool:
+        v = part[self.atr]
+        return v < self.ref if self.op == "<" else v > self.ref
+
+    def split(self, box: Box) -> tuple[Box | None, Box | None]:
+        """The parts of box sent to out and left for the next stage"""
+        lo, hi = box[self.atr]
+        cut = self.ref if self.op == "<" else self.ref + 1
+        below = (lo, min(cut, hi)) if lo < cut else None
+        above = (max(cut, lo), hi) if cut < hi else None
+        if self.op == ">":
+            below, above = above, below
+        return (
+            None if below is None else (*box[: self.atr], below, *box[self.atr + 1 :]),
+            None if above is None else (*box[: self.atr], above, *box[self.atr + 1 :]),
+        )
 
 
 class Workflow:
@@ -46,15 +65,20 @@ class Workflow:
         self.stages = stages
         self.default = default
 
-    def apply(self, part: Part):
+    def apply(self, part: Part) -> str:
         for stage in self.stages:
-            out = stage.apply(part)
-            if out is not None:
-                return out
+            if stage.sends(part):
+                return stage.out
         return self.default
 
 
 class System:
+    """
+    The workflows, walked per part for a few parts, or compiled once into the
+    disjoint boxes of accepted parts with a bitmask index per attribute for
+    classifying parts in bulk.
+    """
+
     def __init__(self, workflows: list[str]) -> None:
         self.workflows: dict[str, Workflow] = {}
         for r in workflows:
@@ -65,73 +89,92 @@ class System:
                 cond, out = step.split(":")
                 op = ">" if ">" in step else "<"
                 atr, ref = cond.split(op)
-                stages.append(Stage(atr, op, int(ref), out))
+                stages.append(Stage(ATTRIBUTES.index(atr), op, int(ref), out))
             self.workflows[wf] = Workflow(stages, str_stages[-1])
 
-    def process_part(self, part: Part) -> int:
-        wf = "in"
-        while wf not in "AR":
-            wf = self.workflows[wf].apply(part)
-        return part.rating if wf == "A" else 0
-
-    def exhaust(self):
-        idx = {"x": 0, "m": 1, "a": 2, "s": 3}
-        states = [("in",) + ((1, 4001),) * 4]
-        total = 0
+    @cached_property
+    def accepted(self) -> list[Box]:
+        boxes = []
+        states: list[tuple[str, Box]] = [("in", (LIMITS,) * len(ATTRIBUTES))]
         while states:
-            wf, *lims = states.pop()
-
+            wf, box = states.pop()
             if wf == "R":
                 continue
-            logger.v(f"\n{wf + ' ':─<79}┤")
-
             if wf == "A":
-                value = prod(lim[1] - lim[0] for lim in lims)
-                logger.v(lims, "→", value)
-                total += value
+                boxes.append(box)
                 continue
+            workflow = self.workflows[wf]
+            for stage in workflow.stages:
+                out, rest = stage.split(box)
+                if out is not None:
+                    states.append((stage.out, out))
+                if rest is None:
+                    break
+                box = rest
+            else:
+                states.append((workflow.default, box))
+        if logger.is_verbose:
+            logger.v(f"{len(boxes)} accepted boxes", *boxes, sep="\n")
+        return boxes
+
+    @cached_property
+    def _index(self) -> list[tuple[list[int], list[int]]]:
+        """
+        Per attribute the sorted box bounds and, for each slab between them,
+        a bitmask of the accepted boxes covering it
+        """
+        index = []
+        for atr in range(len(ATTRIBUTES)):
+            enter: defaultdict[int, int] = defaultdict(int)
+            leave: defaultdict[int, int] = defaultdict(int)
+            for i, box in enumerate(self.accepted):
+                lo, hi = box[atr]
+                enter[lo] |= 1 << i
+                leave[hi] |= 1 << i
+            bounds = sorted(enter.keys() | leave.keys())
+            masks = [0]
+            for b in bounds:
+                masks.append((masks[-1] | enter[b]) & ~leave[b])
+            index.append((bounds, masks))
+        return index
+
+    def accepts(self, part: Part) -> bool:
+        """The boxes are disjoint, so accepted iff one box covers every value"""
+        boxes = -1
+        for (bounds, masks), v in zip(self._index, part):
+            boxes &= masks[bisect_right(bounds, v)]
+            if not boxes:
+                return False
+        return True
+
+    def walk(self, part: Part) -> bool:
+        wf = "in"
+        while wf not in "AR":
+            wf = self.workflows[wf].apply(part)
+        return wf == "A"
+
+    def classify_many(self, parts: Sequence[Part]) -> list[bool]:
+        """
+        Whether each part is accepted, through the box index when there are
+        enough parts to pay for compiling and indexing the boxes
+        """
+        check = self.accepts if len(parts) >= BULK_PARTS else self.walk
+        return [check(part) for part in parts]
 
-            self._split_on_workflow(idx, states, wf, lims)
-        return total
-
-    def _split_on_workflow(self, idx: dict, states: list, wf: str, lims: list):
-        workflow = self.workflows[wf]
-        for stage in workflow.stages:
-            ref = stage.ref
-            out = stage.out
-            atr_i = idx[stage.atr]
-            bound = lims[atr_i]
-            if stage.op == "<":
-                if bound[0] > ref:
-                    continue
-                out_bnd = (bound[0], min(ref, bound[1]))
-                stay_bnd = (max(ref, bound[0]), bound[1])
-            elif stage.op == ">":
-                if bound[1] < ref:
-                    continue
-                stay_bnd = (bound[0], min(ref + 1, bound[1]))
-                out_bnd = (max(ref + 1, bound[0]), bound[1])
-            out_lims = lims.copy()
-            out_lims[atr_i] = out_bnd
-            lims[atr_i] = stay_bnd
-            states.append((out, *out_lims))
-            logger.v(f"{out}: {out_lims}\nstay: {lims}\n")
-
-        states.append((workflow.default, *lims))
-
-        if logger.level > 2:
-            logger.log(3, f"\n{'┌':─<10}STATES", "\n".join(map(str, states)), sep="\n")
+    def exhaust(self) -> int:
+        return sum(prod(hi - lo for lo, hi in box) for box in self.accepted)
 
 
 def split_input(filename: str) -> list[list[str]]:
-    return [block.split("\n") for block in open(filename).read().split("\n\n")]
+    return [list(block) for block in load_input(filename).blocks]
 
 
 def sum_accepted(filename: str):
     workflows, parts = split_input(filename)
-    parts = [Part.from_str(p) for p in parts]
-    workflows = System(workflows)
-    return sum(map(workflows.process_part, parts))
+    system = System(workflows)
+    ratings = [Part.from_str(p) for p in parts]
+    accepted = system.classify_many(ratings)
+    return sum(part.rating for part, ok in zip(ratings, accepted) if ok)
 
 
 def count_acceptable(filename: str):
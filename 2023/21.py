@@ -1,57 +1,64 @@
-from collections import deque as DQ
-
-from common import P2D, do_part_on_input, lines, logger
+from common import P2D, do_part_on_input, load_input, logger
 from common.visuals import p2d_sets_string
 
-DIRECTIONS = ((0, 1), (1, 0), (0, -1), (-1, 0))
-
-
-def neighbors(i: int, j: int):
-    return ((i + di, j + dj) for di, dj in DIRECTIONS)
-
-
-def read_garden(filename: str):
-    rocks = set()
-    si, sj = 0, 0
-    for i, line in enumerate(lines(filename)):
-        for j, ch in enumerate(line):
-            if ch == "#":
-                rocks.add((i, j))
-            elif ch == "S":
-                si, sj = i, j
-    return rocks, (si, sj), j + 1
-
-
-def num_spots(rocks: set[P2D], start_pos: P2D, max_steps: int, mod: int = 0):
-    visited = set()
-    end_positions = set()
-    queue = DQ([(start_pos, 0)])
-    end_modulo = max_steps % 2
-    while queue:
-        pos, dist = queue.popleft()
-        if pos in visited:
-            continue
-        if dist % 2 == end_modulo:
-            end_positions.add(pos)
-        visited.add(pos)
-        if dist + 1 > max_steps:
-            continue
-        for ni, nj in neighbors(*pos):
-            if mod:
-                valid = (ni % mod, nj % mod) not in rocks
-            else:
-                valid = (ni, nj) not in rocks
-            if valid:
-                queue.append(((ni, nj), dist + 1))
+
+def read_garden(filename: str) -> tuple[tuple[str, ...], P2D]:
+    rows = load_input(filename).grid
+    si = next(i for i, row in enumerate(rows) if "S" in row)
+    return rows, (si, rows[si].index("S"))
+
+
+def garden_bits(rows: tuple[str, ...], tiles: int) -> tuple[int, int]:
+    """
+    Plots of the garden repeated tiles × tiles as one int, bit i * stride + j is
+    cell (i, j). Each row has a zero guard bit so shifts by ±1 can't wrap rows.
+    Returns the plots and the stride.
+    """
+    cells = [
+        "0" + "".join("0" if ch == "#" else "1" for ch in row * tiles)[::-1]
+        for row in rows
+    ] * tiles
+    return int("".join(reversed(cells)), 2), len(rows[0]) * tiles + 1
+
+
+def bits_to_positions(bits: int, stride: int) -> set[P2D]:
+    binary = bin(bits)[:1:-1]
+    return {divmod(k, stride) for k, b in enumerate(binary) if b == "1"}
+
+
+def reachable_counts(
+    rows: tuple[str, ...], start_pos: P2D, max_steps: int, tiled: bool = False
+) -> list[int]:
+    """
+    Number of plots reachable in exactly 0..max_steps steps. The frontier is a
+    bitset of the whole garden, so a step is four shifts masked by the plots.
+    Tiled gardens are repeated until the walk can't reach the edge.
+    """
+    height, width = len(rows), len(rows[0])
+    n = -(-max_steps // min(height, width)) if tiled else 0
+    plots, stride = garden_bits(rows, 2 * n + 1)
+    si, sj = start_pos
+    reached = 1 << ((n * height + si) * stride + n * width + sj)
+    counts = [1]
+    for _ in range(max_steps):
+        reached = (
+            reached << 1 | reached >> 1 | reached << stride | reached >> stride
+        ) & plots
+        counts.append(reached.bit_count())
     if logger.level > 1:
+        end_positions = bits_to_positions(reached, stride)
         logger.v(end_positions)
-        logger.m(p2d_sets_string(end_positions, visited))
-    return len(end_positions)
+        logger.m(p2d_sets_string(end_positions, bits_to_positions(plots, stride)))
+    return counts
+
+
+def num_spots(rows: tuple[str, ...], start_pos: P2D, max_steps: int, tiled=False):
+    return reachable_counts(rows, start_pos, max_steps, tiled)[-1]
 
 
 def part1(filename: str):
-    rocks, start_pos, _ = read_garden(filename)
-    return num_spots(rocks, start_pos, 64)
+    rows, start_pos = read_garden(filename)
+    return num_spots(rows, start_pos, 64)
 
 
 def extrapolate_quad(y0: float, y1: float, y2: float):
@@ -72,13 +79,22 @@ def extrapolate_quad(y0: float, y1: float, y2: float):
 
 
 def part2(filename: str, target: int = 26501365):
-    rocks, start_pos, edge_len = read_garden(filename)
+    rows, start_pos = read_garden(filename)
+    edge_len = len(rows)
     radius = edge_len // 2
     max_steps = [radius + edge_len * i for i in range(3)]
-    y = [num_spots(rocks, start_pos, s, edge_len) for s in max_steps]
+    if target <= max_steps[-1]:
+        return num_spots(rows, start_pos, target, tiled=True)
+    counts = reachable_counts(rows, start_pos, max_steps[-1], tiled=True)
+    y = [counts[s] for s in max_steps]
     x = (target - radius) // edge_len
     logger.v(max_steps, y, x)
-    return int(extrapolate_quad(*y)(x))
+    f = extrapolate_quad(*y)
+    if logger.is_verbose:
+        check_steps = radius + edge_len * 3
+        exact = num_spots(rows, start_pos, check_steps, tiled=True)
+        logger.v(f"Exact at {check_steps}: {exact}, extrapolated: {int(f(3))}")
+    return int(f(x))
 
 
 def main():
@@ -1,8 +1,11 @@
 from collections import defaultdict as DD
 from collections import deque as DQ
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
 from typing import Iterable, TypeAlias
 
-from common import P2D, do_part_on_input, lines, logger
+from common import P2D, do_part_on_input, lines, logger, n_jobs
 from common.visuals import p2d_sets_string
 
 DIRECTIONS = {">": 1j, "v": 1, "<": -1j, "^": -1}
@@ -88,28 +91,104 @@ def compress_map(
     return graph
 
 
+# node, visited bitmask, distance, upper bound on what's left, path so far
+Hike: TypeAlias = tuple[int, int, int, int, tuple[int, ...]]
+
+
+@dataclass
+class TrailGraph:
+    """Junctions relabelled 0..n-1, so a set of visited junctions is a bitmask"""
+
+    nodes: list[complex]
+    adj: list[list[tuple[int, int]]]
+    best_in: list[int]  # Longest edge into each node, for the upper bound
+    source: int
+    target: int
+
+    @classmethod
+    def from_graph(
+        cls, graph: WeightedGraph, target: complex, source: complex = START_POS
+    ) -> "TrailGraph":
+        nodes = list({source, target, *graph, *(d for e in graph.values() for d in e)})
+        label = {node: i for i, node in enumerate(nodes)}
+        adj: list[list[tuple[int, int]]] = [[] for _ in nodes]
+        best_in = [0] * len(nodes)
+        for node, edges in graph.items():
+            for dest, dist in edges.items():
+                adj[label[node]].append((label[dest], dist))
+                best_in[label[dest]] = max(best_in[label[dest]], dist)
+        for out in adj:
+            out.sort(key=lambda e: -e[1])  # Long edges first find good bounds early
+        return cls(nodes, adj, best_in, label[source], label[target])
+
+    def start(self) -> Hike:
+        remaining = sum(self.best_in) - self.best_in[self.source]
+        return self.source, 1 << self.source, 0, remaining, (self.source,)
+
+    def expand(self, hike: Hike) -> list[Hike]:
+        node, visited, dist, remaining, path = hike
+        return [
+            (n, visited | 1 << n, dist + d, remaining - self.best_in[n], path + (n,))
+            for n, d in self.adj[node]
+            if not visited >> n & 1
+        ]
+
+
+def longest_from(tg: TrailGraph, hike: Hike) -> tuple[int, tuple[int, ...]]:
+    """
+    DFS over bitmask states, pruning hikes that can't beat the best even if
+    every unvisited junction was entered by its longest edge
+    """
+    adj, best_in, target = tg.adj, tg.best_in, tg.target
+    best, best_path = -1, tuple[int, ...]()
+    path = list(hike[4])
+
+    def dfs(node: int, visited: int, dist: int, remaining: int):
+        nonlocal best, best_path
+        if node == target:
+            if dist > best:
+                best, best_path = dist, tuple(path)
+            return
+        if dist + remaining <= best:
+            return
+        for n, d in adj[node]:
+            if not visited >> n & 1:
+                path.append(n)
+                dfs(n, visited | 1 << n, dist + d, remaining - best_in[n])
+                path.pop()
+
+    dfs(*hike[:4])
+    return best, best_path
+
+
 def dfs_longest_path(
     graph: WeightedGraph,
     target: complex,
     source: complex = START_POS,
+    jobs: int = 1,
 ) -> tuple[int, list[complex]]:
-    to_visit = [(source, [source], 0)]
-    paths_to_target = {}
-    while to_visit:
-        c_pos, c_path, c_dist = to_visit.pop()
-        if c_pos == target:
-            paths_to_target[c_dist] = c_path
-            continue
-
-        for n_pos, dist in graph[c_pos].items():
-            if n_pos in c_path:
-                continue
-
-            n_dist = c_dist + dist
-            n_path = c_path + [n_pos]
-
-            to_visit.append((n_pos, n_path, n_dist))
-    return max(paths_to_target.items(), key=lambda x: x[0])
+    """With jobs > 1, the first few levels are split over a process pool"""
+    tg = TrailGraph.from_graph(graph, target, source)
+    results: list[tuple[int, tuple[int, ...]]] = []
+    hikes = [tg.start()]
+    while jobs > 1 and 0 < len(hikes) < 4 * jobs:
+        frontier = []
+        for hike in hikes:
+            if hike[0] == tg.target:  # Finished, nothing to expand
+                results.append((hike[2], hike[4]))
+            else:
+                frontier += tg.expand(hike)
+        if len(frontier) <= len(hikes):
+            hikes = frontier
+            break  # Not growing, the pool wouldn't help
+        hikes = frontier
+    if len(hikes) < 4 * jobs:
+        results += [longest_from(tg, hike) for hike in hikes]
+    else:
+        with ProcessPoolExecutor(jobs) as pool:
+            results += pool.map(longest_from, repeat(tg), hikes)
+    cmax, path = max(results, default=(-1, ()))
+    return cmax, [tg.nodes[n] for n in path]
 
 
 def reversify_edges(graph: WeightedGraph) -> None:
@@ -151,7 +230,7 @@ def hike_long(filename: str, can_climb: bool = False) -> int:
         it_feels_like_we_only_go_forwards(graph)
     print_graph_maybe(graph)
 
-    cmax, path = dfs_longest_path(graph, end_pos)
+    cmax, path = dfs_longest_path(graph, end_pos, jobs=n_jobs())
 
     if logger.is_verbose:
         from string import ascii_letters as al
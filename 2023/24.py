@@ -1,8 +1,8 @@
-import re
 from dataclasses import dataclass
 from itertools import combinations
 
-from common import do_part_on_input, lines, logger
+from common import do_part_on_input, logger
+from common.input_parsing import int_rows
 from common.maths import F2D, F3D, BBox
 
 SMALL_BOX = BBox((7, 7), (27, 27))
@@ -67,9 +67,7 @@ def count_intersections_within_bounds(filename: str) -> int:
 
 
 def parse_stones(filename: str) -> list[Stone]:
-    re_int = re.compile(r"-?\d+")
-    stones = [Stone(*(int(s) for s in re_int.findall(s))) for s in lines(filename)]
-    return stones
+    return [Stone(*row) for row in int_rows(filename, 6)]
 
 
 def find_line_intersecting_all(filename: str) -> int:
@@ -1,217 +1,155 @@
 """--- Day 6: Guard Gallivant ---"""
 
-from typing import TypeAlias
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import cached_property
+from itertools import repeat
 
-from common import P2D, do_part, lines, logger, parse_input_with
-from common.maths import BBox
+from common import do_part, logger, n_jobs, parse_input_with
+from common.grid import Grid
 from common.visuals import p2d_sets_string
 
-CLOCKWISE: dict[P2D, P2D] = {
-    (-1, 0): (0, 1),
-    (0, 1): (1, 0),
-    (1, 0): (0, -1),
-    (0, -1): (-1, 0),
-}
-ARROW = {
-    (-1, 0): "↑",
-    (0, 1): "→",
-    (1, 0): "↓",
-    (0, -1): "←",
-}
-MAX_STEPS = 100_000
-
-
-GuardState: TypeAlias = tuple[P2D, P2D]  # position, direction
-CheckResult: TypeAlias = set[GuardState] | None
-Shortcuts: TypeAlias = dict[
-    GuardState, tuple[GuardState | None, set[P2D]]
-]  # state, (next_state, states)
-
-
-def parse_map(filename: str) -> tuple[P2D, set[P2D]]:
-    guard_pos = None
-    obstacles: set[P2D] = set()
-    for i, line in enumerate(lines(filename)):
-        for j, c in enumerate(line):
-            if c == ".":
-                continue
-            if c == "#":
-                obstacles.add((i, j))
-            elif c == "^":
-                guard_pos = (i, j)
-    if guard_pos is None:
-        raise ValueError("no guard?")
-    return guard_pos, obstacles
-
-
-def step(
-    state: GuardState,
-    obstacles: set[P2D],
-    bbox: BBox,
-) -> GuardState | None:
-    """Returns None if guard is out of bounds"""
-    p, d = state
-    np = (p[0] + d[0], p[1] + d[1])
-    if np in obstacles:
-        return (p, CLOCKWISE[d])
-    if np not in bbox:
-        return None
-    return (np, d)
-
-
-def step_until_turn(
-    state: GuardState,
-    obstacles: set[P2D],
-    bbox: BBox,
-    include_obstacle: bool = False,
-) -> tuple[GuardState | None, set[P2D]]:
-    visited: set[P2D] = set()
-    while True:
-        visited.add(state[0])
-        new_state = step(state, obstacles, bbox)
-        if new_state is None:
-            return None, visited
-        if new_state[1] != state[1]:
-            if include_obstacle:
-                # add obstacle hit
-                visited.add((state[0][0] + state[1][0], state[0][1] + state[1][1]))
-            return new_state, visited
-        state = new_state
-
-
-def count_guard_visited(guard_pos: P2D, obstacles: set[P2D]) -> int:
-    state: GuardState = (guard_pos, (-1, 0))  # Up
-    visited: set[P2D] = set()
-    bbox = BBox.from_tuples(obstacles)
-    for _ in range(MAX_STEPS):
-        new_state, v = step_until_turn(state, obstacles, bbox)
-        visited |= v
-        if logger.is_verbose:
-            logger.m("\n" + p2d_sets_string(visited, obstacles))
-        if new_state is None:
-            return len(visited)
-        state = new_state
-    raise RuntimeError("Took 1M steps, something is wrong")
-
-
-def count_looping_obstacles(guard_pos: P2D, obstacles: set[P2D]) -> int:
+OUTSIDE = 0  # Grid border
+OBSTACLE = ord("#")
+ARROW = "↑→↓←"
+
+
+@dataclass
+class Lab:
     """
-    until exiting:
-        step
-        if front pos not visited:
-            place obstacle
-            while inside:
-                step
-                if revisiting pos,dir pair:
-                    cnt += 1
-                    break
-            pop obstacle
+    Guard states are idx * 4 + d with d clockwise from up. jump[state] is the
+    state after walking straight until an obstacle and turning, -1 for leaving.
     """
-    state: GuardState = (guard_pos, (-1, 0))  # Up
-    visited: set[P2D] = set()
-    bbox = BBox.from_tuples(obstacles)
-    count = 0
-    warp: Shortcuts = {}
-    for _ in range(MAX_STEPS):
-        new_state = step(state, obstacles, bbox)
-        if new_state is None:
-            return count
-
-        pos = new_state[0]
-        if pos not in visited:
-            try_obstacle = pos
-            if try_obstacle not in obstacles and try_obstacle in bbox:
-                obstacles.add(try_obstacle)
-                states = check_if_looping(
-                    state,
-                    obstacles,
-                    bbox,
-                    warp,
-                    try_obstacle,
-                )
-                if logger.is_verbose and states is not None:
-                    show_states(states, obstacles, try_obstacle, visited, warp)
-                count += states is not None
-                obstacles.remove(try_obstacle)
+
+    grid: Grid
+    guard: int
+
+    @property
+    def offsets(self) -> tuple[int, int, int, int]:
+        return -self.grid.stride, 1, self.grid.stride, -1
+
+    @classmethod
+    def from_grid(cls, grid: Grid) -> "Lab":
+        guard = grid.find("^")
+        if guard == -1:
+            raise ValueError("no guard?")
+        return cls(grid, guard)
+
+    @cached_property
+    def jump(self) -> list[int]:
+        data = self.grid.data
+        jump = [-1] * (4 * len(data))
+        cells = list(self.grid.indices())
+        for d, off in enumerate(self.offsets):
+            turn = (d + 1) % 4
+            # Cells nearest to the end of the walk first, so jump[ahead] is known
+            for idx in cells if off < 0 else reversed(cells):
+                ahead = idx + off
+                if data[ahead] == OBSTACLE:
+                    jump[4 * idx + d] = 4 * idx + turn
+                elif data[ahead] != OUTSIDE:
+                    jump[4 * idx + d] = jump[4 * ahead + d]
+        return jump
+
+    def walk(self) -> list[int]:
+        """States of the guard's patrol, one per step"""
+        data, offsets = self.grid.data, self.offsets
+        idx, d = self.guard, 0
+        states = []
+        while data[idx] != OUTSIDE:
+            states.append(4 * idx + d)
+            if data[idx + offsets[d]] == OBSTACLE:
+                d = (d + 1) % 4
             else:
-                logger.v(
-                    "not trying",
-                    try_obstacle,
-                    try_obstacle not in obstacles,
-                    try_obstacle in bbox,
-                )
-
-        state = new_state
-        visited.add(pos)
-    raise RuntimeError("Took many steps, something is wrong")
-
-
-def show_states(
-    states: set[GuardState],
-    obstacles: set[P2D],
-    mark: P2D,
-    visited: set[P2D],
-    warp: Shortcuts,
-):
+                idx += offsets[d]
+        return states
+
+    def loops(self, state: int, obstacle: int, seen: list[int], stamp: int) -> bool:
+        """
+        Whether the guard in `state` loops with an extra obstacle. Jumps are
+        only corrected when the obstacle is on the straight stretch ahead.
+        """
+        jump, offsets, stride = self.jump, self.offsets, self.grid.stride
+        while state != -1:
+            if seen[state] == stamp:
+                return True
+            seen[state] = stamp
+            idx, d = divmod(state, 4)
+            nxt = jump[state]
+            off = offsets[d]
+            ahead, rest = divmod(obstacle - idx, off)
+            if (
+                ahead > 0
+                and rest == 0
+                and (d % 2 == 0 or obstacle // stride == idx // stride)
+                and (nxt == -1 or ahead <= (nxt // 4 - idx) // off)
+            ):
+                nxt = 4 * (obstacle - off) + (d + 1) % 4
+            state = nxt
+        return False
+
+
+def count_loops(lab: Lab, candidates: list[tuple[int, int]]) -> int:
+    seen = [-1] * len(lab.jump)
+    count = 0
+    for stamp, (state, obstacle) in enumerate(candidates):
+        looping = lab.loops(state, obstacle, seen, stamp)
+        count += looping
+        if looping and logger.is_debug:
+            show(lab, {i for i, s in enumerate(seen) if s == stamp}, obstacle)
+    return count
+
+
+def show(lab: Lab, states: set[int], mark: int | None = None):
+    grid = lab.grid
     logger.m(
         "\n"
         + p2d_sets_string(
-            {s[0] for s in states},
-            obstacles,
-            symbols={mark: "X"},
-            secondary_symbols={
-                **{_: "░" for _ in visited},
-                **{p: ARROW[d] for p, d in warp},
-            },
+            {grid.pos(s // 4) for s in states},
+            {grid.pos(i) for i in grid.find_all(OBSTACLE)},
+            symbols={} if mark is None else {grid.pos(mark): "X"},
+            secondary_symbols={grid.pos(s // 4): ARROW[s % 4] for s in states},
         )
     )
 
 
-def check_if_looping(
-    state: GuardState,
-    obstacles: set[P2D],
-    bbox: BBox,
-    warp: Shortcuts,
-    new_obstacle: P2D,
-) -> CheckResult:
-    """Only returns the state set for visualisation, could be bool"""
-    states: set[GuardState] = set()
-    visited: set[P2D] = set()
-    new_state: GuardState | None = None
-    skip_cache = True
-    for _ in range(MAX_STEPS):
-        warped = False
-        if state in warp:
-            new_state, visited = warp[state]
-            if new_obstacle not in visited:
-                warped = True
-
-        if not warped:
-            new_state, visited = step_until_turn(
-                state, obstacles, bbox, include_obstacle=True
-            )
-            if not skip_cache and new_obstacle not in visited:
-                warp[state] = (new_state, visited)
-
-            skip_cache = new_obstacle in visited
-
-        if logger.is_debug:
-            show_states(states, obstacles, new_obstacle, visited, warp)
-
-        if new_state is None:
-            return None
-        state = new_state
-        if state in states:
-            return states
-        states.add(state)
-
-    raise RuntimeError("Took many steps, something is wrong")
+def parse_map(filename: str) -> Lab:
+    return Lab.from_grid(Grid.from_input(filename, border=OUTSIDE))
+
+
+def count_guard_visited(lab: Lab) -> int:
+    states = lab.walk()
+    if logger.is_verbose:
+        show(lab, set(states))
+    return len({s // 4 for s in states})
+
+
+def count_looping_obstacles(lab: Lab) -> int:
+    """
+    An obstacle on each cell of the patrol but the start, the guard starting
+    from where it first walks into it. Candidates are split over -j processes.
+    """
+    states = lab.walk()
+    candidates = []
+    tried = {lab.guard}
+    for state, next_state in zip(states, states[1:]):
+        obstacle = next_state // 4
+        if obstacle not in tried:
+            tried.add(obstacle)
+            candidates.append((state, obstacle))
+
+    jobs = n_jobs()
+    if jobs == 1:
+        return count_loops(lab, candidates)
+    chunks = [candidates[i::jobs] for i in range(jobs)]
+    with ProcessPoolExecutor(jobs) as pool:
+        return sum(pool.map(count_loops, repeat(lab), chunks))
 
 
 def main():
-    guard_pos, obstacles = parse_input_with(parse_map)
-    do_part(1, count_guard_visited, guard_pos, obstacles)
-    do_part(2, count_looping_obstacles, guard_pos, obstacles)
+    lab = parse_input_with(parse_map)
+    do_part(1, count_guard_visited, lab)
+    do_part(2, count_looping_obstacles, lab)
 
 
 if __name__ == "__main__":
@@ -3,7 +3,7 @@
 from typing import TypeAlias
 
 from common import do_part_on_input, logger
-from common.input_parsing import re_2d
+from common.input_parsing import int_rows
 from common.maths import P2D
 
 MachineSpec: TypeAlias = tuple[P2D, P2D, P2D]  # D_a, D_b, P
@@ -67,15 +67,10 @@ def fewest_tokens_to_win_all(filename: str, offset: bool = False) -> int:
 
 
 def read_machines(filename: str) -> list[MachineSpec]:
-    machines = []
-    with open(filename) as f:
-        machines = [parse_machine(b) for b in f.read().split("\n\n")]
-    return machines
-
-
-def parse_machine(s: str) -> MachineSpec:
-    a, b, p = s.splitlines()
-    return re_2d(a), re_2d(b), re_2d(p)
+    return [
+        ((ai, aj), (bi, bj), (pi, pj))
+        for ai, aj, bi, bj, pi, pj in int_rows(filename, 6)
+    ]
 
 
 def main():
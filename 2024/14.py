@@ -5,8 +5,8 @@ from dataclasses import dataclass
 from functools import reduce
 from operator import mul
 
-from common import do_part_on_input, lines, logger
-from common.input_parsing import USE_SMALL_FILE, re_4d
+from common import do_part_on_input, logger
+from common.input_parsing import USE_SMALL_FILE, int_rows
 from common.maths import P2D, BBox, neighbors_4
 from common.visuals import p2d_sets_string
 
@@ -45,7 +45,7 @@ class Robot:
 
 
 def safety_factor_after_t(filename: str) -> int:
-    robots = [Robot(*re_4d(line)) for line in lines(filename)]
+    robots = [Robot(*row) for row in int_rows(filename, 4)]
 
     if logger.is_verbose:
         show_robots(robots)
@@ -85,7 +85,7 @@ def show_robots(robots: list[Robot], t: int = 0):
 
 
 def look_for_picture(filename: str) -> int:
-    robots = [Robot(*re_4d(line)) for line in lines(filename)]
+    robots = [Robot(*row) for row in int_rows(filename, 4)]
     most_robots = len(robots) // 4  # most, 25%. same same
     c = 0
     while True:
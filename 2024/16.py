@@ -1,114 +1,122 @@
 """--- Day 16: Reindeer Maze ---"""
 
-from heapq import heappop, heappush
-from typing import TypeAlias
+from collections.abc import Iterator
+from dataclasses import dataclass
 
-from common import do_part_on_input, lines, logger
-from common.maths import P2D
+from common import do_part_on_input, logger
+from common.grid import Grid
+from common.search import SearchResult, dijkstra
 from common.visuals import p2d_sets_string
 
-Maze: TypeAlias = tuple[set[P2D], P2D, P2D]
-State: TypeAlias = tuple[int, P2D, P2D]
 DEER = "𐂂"
-CLOCKWISE: dict[P2D, P2D] = {
-    (-1, 0): (0, 1),
-    (0, 1): (1, 0),
-    (1, 0): (0, -1),
-    (0, -1): (-1, 0),
-}
-COUNTERCLOCKWISE = {v: k for k, v in CLOCKWISE.items()}
+WALL = ord("#")
+EAST = 1
 TURN_COST = 1000
 MOVE_COST = 1
 
 
-def read_maze(filename: str) -> Maze:
-    walls: set[P2D] = set()
-    start, end = (-1, -1), (-1, -1)
-    for i, line in enumerate(lines(filename)):
-        for j, c in enumerate(line):
-            if c == "#":
-                walls.add((i, j))
-            elif c == "S":
-                start = (i, j)
-            elif c == "E":
-                end = (i, j)
-
-    if logger.is_debug:
+@dataclass
+class Maze:
+    """
+    States are idx * 4 + d with d clockwise from north. A step moves one tile,
+    turning first if the direction changes, like the reindeer would.
+    """
+
+    grid: Grid
+    start: int
+    end: int
+
+    @property
+    def offsets(self) -> tuple[int, int, int, int]:
+        return -self.grid.stride, 1, self.grid.stride, -1
+
+    def edges(self, state: int) -> Iterator[tuple[int, int]]:
+        idx, d = divmod(state, 4)
+        data, offsets = self.grid.data, self.offsets
+        for nd in (d, (d + 1) % 4, (d - 1) % 4):
+            npos = idx + offsets[nd]
+            if data[npos] != WALL:
+                yield 4 * npos + nd, MOVE_COST + TURN_COST * (d != nd)
+
+    def reverse_edges(self, state: int) -> Iterator[tuple[int, int]]:
+        idx, nd = divmod(state, 4)
+        prev = idx - self.offsets[nd]
+        if self.grid[prev] != WALL:
+            for d in (nd, (nd + 1) % 4, (nd - 1) % 4):
+                yield 4 * prev + d, MOVE_COST + TURN_COST * (d != nd)
+
+    def is_end(self, state: int) -> bool:
+        return state // 4 == self.end
+
+    def show(self, tiles: set[int]):
         logger.m(
             p2d_sets_string(
-                symbols={start: "S", end: "E"},
-                secondary_set=walls,
+                symbols={self.grid.pos(idx): DEER for idx in tiles},
+                secondary_set={self.grid.pos(idx) for idx in self.grid.find_all(WALL)},
             )
         )
-    return walls, start, end
-
-
-def lowest_score_path(maze: Maze, keep_all: bool = False) -> tuple[int, int]:
-    walls, start, end = maze
-    d = (0, 1)
-    state = (0, start, d)
-    queue: list[State] = [state]  # cost, position, direction, path
-    visited: set[P2D] = set()
-    paths_to: dict[tuple[P2D, P2D], tuple[int, set[P2D]]] = {(start, d): (0, {start})}
-    best_cost = 1_000_000_000_000
-    best_paths = set()
-    while queue:
-        cost, pos, d = heappop(queue)
-        st = pos, d
-
-        if pos in visited and not keep_all:
-            continue
-        visited.add(pos)
-
-        if cost > best_cost:
-            break
-        if pos == end:
-            best_cost = cost
-            best_paths.update(paths_to[st][1])
-
-        # Step
-        for nd in (d, CLOCKWISE[d], COUNTERCLOCKWISE[d]):
-            npos = pos[0] + nd[0], pos[1] + nd[1]
-            ncost = cost + MOVE_COST + TURN_COST * (d != nd)
-            if npos not in walls:
-                nst = (npos, nd)
-                if nst in paths_to:
-                    if paths_to[nst][0] < ncost:
-                        continue
-                    paths_to[nst] = (ncost, paths_to[nst][1] | paths_to[st][1])
-                    if logger.is_debug:
-                        logger.m(
-                            p2d_sets_string(
-                                symbols={
-                                    **{p: " " for p in paths_to[st][1]},
-                                    pos: DEER,
-                                },
-                                main_set=visited,
-                                secondary_set=walls,
-                            )
-                        )
-                else:
-                    paths_to[nst] = ncost, paths_to[st][1] | {npos}
-                    heappush(queue, (ncost, npos, nd))
 
-    if logger.is_verbose:
-        logger.m(
-            p2d_sets_string(
-                symbols={pos: DEER for pos in best_paths},
-                secondary_set=walls,
-            )
-        )
-    return best_cost, len(best_paths)
+
+def read_maze(filename: str) -> Maze:
+    grid = Grid.from_input(filename, border=WALL)
+    maze = Maze(grid, grid.find("S"), grid.find("E"))
+    if logger.is_debug:
+        logger.m(str(grid))
+    return maze
+
+
+def lowest_score(maze: Maze, all_preds: bool = False) -> SearchResult:
+    return dijkstra(
+        [4 * maze.start + EAST],
+        maze.edges,
+        goal=maze.is_end,
+        all_preds=all_preds,
+        parents=False,
+    )
+
+
+def best_path_tiles(maze: Maze, bidirectional: bool = False) -> set[int]:
+    """
+    Tiles on any lowest score path, either by one backward sweep over the
+    optimal predecessors, or bidirectionally as the states where the score
+    from the start plus the score to the end is the lowest score. The latter
+    keeps two distance maps and no predecessor lists.
+    """
+    if not bidirectional:
+        res = lowest_score(maze, all_preds=True)
+        return {state // 4 for state in res.optimal_states()}
+
+    forward = dijkstra(
+        [4 * maze.start + EAST], maze.edges, goal=maze.is_end, parents=False
+    )
+    best = forward.cost
+    if best is None:
+        return set()
+    backward = dijkstra(
+        [4 * maze.end + d for d in range(4)], maze.reverse_edges, parents=False
+    )
+    to_end = backward.dist
+    return {
+        state // 4
+        for state, cost in forward.dist.items()
+        if cost + to_end.get(state, best + 1) == best
+    }
 
 
 def get_lowest_cost(filename: str) -> int:
     maze = read_maze(filename)
-    return lowest_score_path(maze)[0]
+    cost = lowest_score(maze).cost
+    if cost is None:
+        raise ValueError("No way to the end")
+    return cost
 
 
 def count_best_path_positions(filename: str) -> int:
     maze = read_maze(filename)
-    return lowest_score_path(maze, keep_all=True)[1]
+    tiles = best_path_tiles(maze)
+    if logger.is_verbose:
+        maze.show(tiles)
+    return len(tiles)
 
 
 def main():
@@ -1,12 +1,97 @@
 """--- Day 17: Chronospatial Computer ---"""
 
 from collections import deque
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass
-from typing import Generator
+from functools import cache
+from typing import Generator, TypeAlias
 
 from common import do_part_on_input, logger
 from common.ansi import highlight
 
+# (a, b, c) -> (output, a, b, c)
+Compiled: TypeAlias = Callable[[int, int, int], tuple[list[int], int, int, int]]
+COMBO = ("0", "1", "2", "3", "a", "b", "c")
+STATEMENTS = (
+    "a >>= {combo}",  # adv
+    "b ^= {literal}",  # bxl
+    "b = {combo} & 7",  # bst
+    "",  # jnz, ends a block
+    "b ^= c",  # bxc
+    "append({combo} & 7)",  # out
+    "b = a >> {combo}",  # bdv
+    "c = a >> {combo}",  # cdv
+)
+
+
+def block_starts(program: tuple[int, ...]) -> list[int]:
+    """
+    Offsets reachable from 0 where a block begins: the start, jump targets
+    and the instruction after each jump. Odd targets begin their own chain of
+    blocks, since the program is then read shifted by one.
+    """
+    n = len(program)
+    starts: set[int] = set()
+    todo = [0]
+    while todo:
+        start = todo.pop()
+        if start >= n or start in starts:
+            continue
+        starts.add(start)
+        for i in range(start, n - 1, 2):
+            if program[i] == 3:
+                todo += [program[i + 1], i + 2]
+                break
+    return sorted(starts)
+
+
+@cache
+def compile_program(program: tuple[int, ...]) -> Compiled:
+    """
+    Python source for the program with registers as locals, split into blocks
+    at jump targets and after jumps, dispatched on `pc` only between blocks.
+    Jumping to or past the end halts (pc = -1), like eval.
+    """
+    n = len(program)
+    starts = block_starts(program)
+    is_start = set(starts)
+    src = ["def run(a, b, c):", "    out = []", "    append = out.append"]
+    src += ["    pc = 0", "    while True:"]
+    for k, start in enumerate(starts):
+        src.append(f"        {'elif' if k else 'if'} pc == {start}:")
+        i = start
+        while True:
+            if i >= n:
+                nxt = "-1"
+                break
+            if i != start and i in is_start:
+                nxt = str(i)
+                break
+            if i + 1 >= n:  # An opcode without operand, eval fails reading it
+                nxt = ""
+                src.append(f"            raise IndexError('No operand at {i}')")
+                break
+            opcode, operand = program[i], program[i + 1]
+            if opcode == 3:
+                target = operand if operand < n else -1
+                nxt = f"{target} if a else {i + 2 if i + 2 < n else -1}"
+                break
+            combo = COMBO[operand] if operand < len(COMBO) else None
+            if combo is None and "{combo}" in STATEMENTS[opcode]:
+                # Only an error if reached, like eval
+                stmt = f"raise ValueError('Invalid operand {operand}')"
+            else:
+                stmt = STATEMENTS[opcode].format(combo=combo, literal=operand)
+            src.append(f"            {stmt}")
+            i += 2
+        if nxt:
+            src.append(f"            pc = {nxt}")
+    src += ["        else:", "            return out, a, b, c"]
+    namespace: dict = {}
+    exec("\n".join(src), namespace)
+    logger.d("\n".join(src))
+    return namespace["run"]
+
 
 @dataclass
 class ChronospatialComputer:
@@ -72,11 +157,20 @@ class ChronospatialComputer:
                 yield output
 
     def run(self) -> list[int]:
-        out = []
-        for o in self.eval():
-            out.append(o)
+        if logger.is_debug or self.instruction:
+            return list(self.eval())
+        out, self.a, self.b, self.c = compile_program(tuple(self.program))(
+            self.a, self.b, self.c
+        )
+        self.instruction = len(self.program)
         return out
 
+    def run_many(self, a_values: Iterable[int]) -> list[list[int]]:
+        """Outputs for each A, with B and C as they are"""
+        run = compile_program(tuple(self.program))
+        b, c = self.b, self.c
+        return [run(a, b, c)[0] for a in a_values]
+
     def combo_operand(self, operand: int) -> int:
         match operand:
             case 4:
@@ -146,11 +240,11 @@ class ChronospatialComputer:
 
         candidates = deque([0])
         logger.v(program)
+        computer = cls(0, 0, 0, program)
         while candidates:
             left = candidates.popleft() << bit_shift
-            for right in range(1 << bit_shift):  # try all A&(bs-1)
-                a = left + right
-                out = cls(a, 0, 0, program).run()
+            a_values = range(left, left + (1 << bit_shift))  # try all A&(bs-1)
+            for a, out in zip(a_values, computer.run_many(a_values)):
                 if out == program[-len(out) :]:
                     # output matches tail
                     logger.v(a, out)
@@ -1,11 +1,12 @@
 """--- Day 18: RAM Run ---"""
 
-from collections import deque
 from typing import Generator, cast
 
 from common import do_part_on_input, lines, logger
+from common.grid import Grid
 from common.input_parsing import USE_SMALL_FILE
-from common.maths import P2D, BBox, neighbors_4
+from common.maths import P2D, BBox
+from common.search import bfs
 from common.visuals import p2d_sets_string
 
 if USE_SMALL_FILE:
@@ -15,6 +16,8 @@ else:
     BBOX = BBox(lower=(0, 0), upper=(70, 70))
     BYTES_FALLEN = 1024
 
+BLOCK = ord("#")
+
 
 def read_block_coords(filename: str) -> Generator[P2D, None, None]:
     """Generator filling shared coords set"""
@@ -23,45 +26,47 @@ def read_block_coords(filename: str) -> Generator[P2D, None, None]:
         yield (int(y), int(x))
 
 
-def get_shortest_path(blocks: set[P2D], bb: BBox) -> set[P2D]:
-    start = (0, 0)
-    end = bb.upper
-    queue: deque[tuple[P2D, set[P2D]]] = deque([(start, set())])
-    visited = set()
-    steps = 0
-    while queue:
-        steps += 1
-        pos, path = queue.popleft()
-        if pos == end:
-            return path
-        if pos in visited:
-            continue
-        visited.add(pos)
-        queue.extend(
-            (nb, path | {pos})
-            for nb in neighbors_4(pos)
-            if nb not in blocks and nb in bb
-        )
+def memory_grid(bb: BBox) -> Grid:
+    height, width = bb.ispan
+    return Grid(["." * width] * height, border=BLOCK)
+
 
-        if logger.is_debug and steps % 100 == 0:
+def get_shortest_path(grid: Grid, bb: BBox) -> set[P2D]:
+    """Positions along a shortest path from the start, excluding the end"""
+    start = grid.idx(cast(P2D, bb.lower))
+    end = grid.idx(cast(P2D, bb.upper))
+    data, d4 = grid.data, grid.d4
+
+    def neighbors(idx: int):
+        return (idx + o for o in d4 if data[idx + o] != BLOCK)
+
+    visited: set[P2D] = set()
+
+    def show(idx: int, cost: int):
+        visited.add(grid.pos(idx))
+        if len(visited) % 100 == 0:
             logger.m(
                 p2d_sets_string(
-                    symbols={pos: "O", **{p: " " for p in path}},
+                    symbols={grid.pos(idx): "O"},
                     main_set=visited,
-                    secondary_set=blocks,
+                    secondary_set={grid.pos(i) for i in grid.find_all(BLOCK)},
                     bounding_box=BBOX,
                 )
-                + str(steps)
+                + str(cost)
             )
-    return set()
+
+    res = bfs([start], neighbors, end.__eq__, visit=show if logger.is_debug else None)
+    return {grid.pos(idx) for idx in res.path()[:-1]}
 
 
 def find_shortest_path_length(filename: str) -> int:
     block_gen = read_block_coords(filename)
+    grid = memory_grid(BBOX)
     blocks = set()
     for _ in range(BYTES_FALLEN):
-        blocks.add(next(block_gen))
-    path = get_shortest_path(blocks, BBOX)
+        blocks.add(block := next(block_gen))
+        grid[grid.idx(block)] = BLOCK
+    path = get_shortest_path(grid, BBOX)
     if logger.is_verbose:
         logger.m(
             p2d_sets_string(
@@ -76,19 +81,22 @@ def find_shortest_path_length(filename: str) -> int:
 
 def find_first_blocking_block(filename: str) -> str:
     block_gen = read_block_coords(filename)
+    grid = memory_grid(BBOX)
     blocks = set()
     for _ in range(BYTES_FALLEN):
-        blocks.add(next(block_gen))
-    path = get_shortest_path(blocks, BBOX)
+        blocks.add(block := next(block_gen))
+        grid[grid.idx(block)] = BLOCK
+    path = get_shortest_path(grid, BBOX)
     # We already know it's possible here from p1
 
     new_block = (-1, -1)
     while path:
         new_block = next(block_gen)
         blocks.add(new_block)
+        grid[grid.idx(new_block)] = BLOCK
         if new_block not in path:
             continue
-        path = get_shortest_path(blocks, BBOX)
+        path = get_shortest_path(grid, BBOX)
 
     if logger.is_verbose:
         logger.m(
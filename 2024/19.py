@@ -1,54 +1,71 @@
 """--- Day 19: Linen Layout ---"""
 
-from functools import cache
+from typing import TypeAlias
 
-from common import do_part_on_input, lines, logger
+from common import do_part, load_input, logger, parse_input_with
 
 
-def read_towels_patterns(filename: str) -> tuple[frozenset[str], list[str]]:
-    towels = []
-    patterns = []
-    for i, line in enumerate(lines(filename)):
-        if i == 0:
-            towels = line.rstrip().split(", ")
-            continue
-        if i == 1:
+def read_towels_patterns(filename: str) -> tuple[frozenset[str], tuple[str, ...]]:
+    towels, _, *patterns = load_input(filename).lines
+    return frozenset(towels.split(", ")), tuple(patterns)
+
+
+Trie: TypeAlias = dict[str, "Trie"]
+END = ""  # Key marking a towel ending at a node, no stripe is ""
+
+
+def build_trie(towels: frozenset[str]) -> Trie:
+    trie: Trie = {}
+    for towel in towels:
+        node = trie
+        for stripe in towel:
+            node = node.setdefault(stripe, {})
+        node[END] = {}
+    return trie
+
+
+def num_possible_ways(pattern: str, trie: Trie) -> int:
+    """ways[i] arrangements of pattern[:i], each reachable i walks the trie on"""
+    n = len(pattern)
+    ways = [0] * (n + 1)
+    ways[0] = 1
+    for i in range(n):
+        if not ways[i]:
             continue
-        patterns.append(line.rstrip())
-
-    return frozenset(towels), patterns
-
-
-@cache
-def num_possible_ways(
-    pattern: str, lengths: tuple[int, ...], towels: frozenset[str]
-) -> int:
-    if pattern == "":
-        return 1
-    ways = 0
-    for w in lengths:
-        if w > len(pattern):
-            return ways
-        if pattern[:w] in towels:
-            ways += num_possible_ways(pattern[w:], lengths, towels)
-    return ways
+        node = trie
+        for j in range(i, n):
+            node = node.get(pattern[j])  # type: ignore[assignment]
+            if node is None:
+                break
+            if END in node:
+                ways[j + 1] += ways[i]
+    return ways[n]
 
 
-def count_possible_patterns(filename: str, sum_arrangements: bool = False) -> int:
+def arrangements(filename: str) -> list[int]:
+    """Ways to arrange each design, counted once for both parts"""
     towels, patterns = read_towels_patterns(filename)
-    towel_lengths = tuple(sorted({len(t) for t in towels}))
-    logger.v(towels, patterns, towel_lengths, sep="\n")
-    c = 0
-    for p in patterns:
-        ways = num_possible_ways(p, towel_lengths, towels)
-        logger.d(ways, p)
-        c += ways if sum_arrangements else bool(ways)
-    return c
+    trie = build_trie(towels)
+    logger.v(towels, patterns, sep="\n")
+    ways = [num_possible_ways(p, trie) for p in patterns]
+    if logger.is_debug:
+        for w, p in zip(ways, patterns):
+            logger.d(w, p)
+    return ways
+
+
+def count_possible_patterns(ways: list[int]) -> int:
+    return sum(map(bool, ways))
+
+
+def sum_arrangements(ways: list[int]) -> int:
+    return sum(ways)
 
 
 def main():
-    do_part_on_input(1, count_possible_patterns)
-    do_part_on_input(2, count_possible_patterns, sum_arrangements=True)
+    ways = parse_input_with(arrangements)
+    do_part(1, count_possible_patterns, ways)
+    do_part(2, sum_arrangements, ways)
 
 
 if __name__ == "__main__":
@@ -1,152 +1,159 @@
 """--- Day 21: Keypad Conundrum ---"""
 
-from common import do_part_on_input, lines, logger
-
-DPAD = [
-    [" ", "^", "A"],
-    ["<", "v", ">"],
-]
-NPAD = [
-    ["7", "8", "9"],
-    ["4", "5", "6"],
-    ["1", "2", "3"],
-    [" ", "0", "A"],
-]
-
-
-def deconstruct_keypad(keypad: list[list[str]]) -> dict[tuple[str, str], str]:
-    movements = {}
-    for i, r in enumerate(keypad):
-        for j, k in enumerate(r):
-            if k == " ":
-                continue
-            for ni, nr in enumerate(keypad):
-                for nj, nk in enumerate(nr):
-                    if nk == " ":
-                        continue
-                    di, dj = ni - i, nj - j
-                    up = (di < 0) * -di * "^"
-                    down = (di > 0) * di * "v"
-                    left = (dj < 0) * -dj * "<"
-                    right = (dj > 0) * dj * ">"
-
-                    # move ordered by distance to A in DPAD
-                    movements[(k, nk)] = left + down + up + right + "A"
-
-                    # Hard-coded overrides for avoiding the non-key states
-                    if k in "741" and nk in "0A":
-                        movements[(k, nk)] = right + down + "A"
-                    elif nk in "741" and k in "0A":
-                        movements[(k, nk)] = up + left + "A"
-                    elif k == "<":
-                        movements[(k, nk)] = right + up + "A"
-                    elif nk == "<":
-                        movements[(k, nk)] = down + left + "A"
-
-    logger.d(keypad, "\n→", movements)
-    return movements
-
-
-DPAD_MAP = deconstruct_keypad(DPAD)
-NPAD_MAP = deconstruct_keypad(NPAD)
-
-
-def replay(seq: str, depth: int) -> str:
+from collections.abc import Iterable, Iterator
+from itertools import pairwise, permutations
+
+from common import do_part_on_input, load_input, logger
+
+MOVES = {"^": (-1, 0), "v": (1, 0), "<": (0, -1), ">": (0, 1)}
+REPLAY_LIMIT = 10_000  # Longest sequence to replay when debugging
+
+Pair = tuple[str, str]
+
+
+class Keypad:
+    def __init__(self, layout: list[str]):
+        self.layout = layout
+        self.keys = {
+            k: (i, j)
+            for i, row in enumerate(layout)
+            for j, k in enumerate(row)
+            if k != " "
+        }
+        self.routes = {
+            (a, b): self._routes(pa, pb)
+            for a, pa in self.keys.items()
+            for b, pb in self.keys.items()
+        }
+        logger.d(layout, "\n→", self.routes)
+
+    def _routes(self, a: tuple[int, int], b: tuple[int, int]) -> list[str]:
+        """Every shortest move order from a to b that stays on the keys"""
+        (i, j), (ni, nj) = a, b
+        moves = ("v" if ni > i else "^") * abs(ni - i)
+        moves += (">" if nj > j else "<") * abs(nj - j)
+        positions = set(self.keys.values())
+        routes = []
+        for order in sorted(set(permutations(moves))):
+            pi, pj = a
+            for m in order:
+                pi, pj = pi + MOVES[m][0], pj + MOVES[m][1]
+                if (pi, pj) not in positions:
+                    break
+            else:
+                routes.append("".join(order))
+        return routes
+
+
+DPAD = Keypad([" ^A", "<v>"])
+NPAD = Keypad(["789", "456", "123", " 0A"])
+
+
+class Robots:
+    """
+    Fewest human presses per key pair on a dpad at each layer, by dynamic
+    programming over every valid route. Layer 0 is the dpad the human presses
+    (cost 1 per key), layer d is the one driven through d robot dpads. Layers
+    and route choices are memoised, so any depth only builds what is missing.
+    """
+
+    def __init__(self) -> None:
+        self.costs: list[dict[Pair, int]] = [dict.fromkeys(DPAD.routes, 1)]
+        self.choices: list[dict[Pair, str]] = [{}]
+        self.npad_choices: dict[int, dict[Pair, str]] = {}
+
+    def layer(self, depth: int) -> dict[Pair, int]:
+        while len(self.costs) <= depth:
+            below = len(self.costs) - 1
+            choice = self.best_routes(DPAD, below)
+            self.choices.append(choice)
+            self.costs.append({p: self.seq_cost(r, below) for p, r in choice.items()})
+            logger.d(below + 1, self.costs[-1])
+        return self.costs[depth]
+
+    def seq_cost(self, seq: str, depth: int) -> int:
+        """Human presses to type seq from A on the dpad at layer depth"""
+        costs = self.layer(depth)
+        return sum(costs[p] for p in pairwise("A" + seq))
+
+    def best_routes(self, keypad: Keypad, depth: int) -> dict[Pair, str]:
+        """Cheapest route and press per pair, typed on the dpad at layer depth"""
+        costs = self.layer(depth)
+        choice = {}
+        for pair, routes in keypad.routes.items():
+            choice[pair] = min(
+                (r + "A" for r in routes),
+                key=lambda s: sum(costs[p] for p in pairwise("A" + s)),
+            )
+        return choice
+
+    def numpad_sequence(self, code: str, depth: int) -> str:
+        """Presses on the dpad driving the numpad robot, through depth dpads"""
+        if depth not in self.npad_choices:
+            self.npad_choices[depth] = self.best_routes(NPAD, depth)
+        choice = self.npad_choices[depth]
+        return "".join(choice[p] for p in pairwise("A" + code))
+
+    def presses(self, seq: str, depth: int) -> Iterator[str]:
+        """Lazily expand seq on the dpad at layer depth into human presses"""
+        if depth == 0:
+            yield from seq
+            return
+        self.layer(depth)
+        choice = self.choices[depth]
+        for p in pairwise("A" + seq):
+            yield from self.presses(choice[p], depth - 1)
+
+
+ROBOTS = Robots()
+
+
+def replay(presses: Iterable[str], depth: int) -> str:
     layers = depth + 1
-    state = [(0, 2)] * depth + [(3, 2)]
-    mv = {"^": (-1, 0), "v": (1, 0), "<": (0, -1), ">": (0, 1)}
-    buff = [""] * layers
-    for k in seq:
-        if k in mv:
-            state[0] = (state[0][0] + mv[k][0], state[0][1] + mv[k][1])
-            for i in range(layers):
-                buff[i] += " "
+    state = [DPAD.keys["A"]] * depth + [NPAD.keys["A"]]
+    seq: list[str] = []
+    buff: list[list[str]] = [[] for _ in range(layers)]
+    for k in presses:
+        seq.append(k)
+        if k in MOVES:
+            state[0] = (state[0][0] + MOVES[k][0], state[0][1] + MOVES[k][1])
+            for b in buff:
+                b.append(" ")
             continue
         ns = [" "] * layers
         for i in range(layers):
             keypad = NPAD if i == depth else DPAD
-            dk = keypad[state[i][0]][state[i][1]]
+            dk = keypad.layout[state[i][0]][state[i][1]]
             ns[i] = dk
-            if dk in mv:
+            if dk in MOVES:
                 state[i + 1] = (
-                    state[i + 1][0] + mv[dk][0],
-                    state[i + 1][1] + mv[dk][1],
+                    state[i + 1][0] + MOVES[dk][0],
+                    state[i + 1][1] + MOVES[dk][1],
                 )
                 break
-        for i in range(layers):
-            buff[i] += ns[i]
+        for b, n in zip(buff, ns):
+            b.append(n)
     logger.d(len(seq))
-    return seq + "\n" + "\n".join(buff)
+    return "\n".join(["".join(seq), *map("".join, buff)])
 
 
-def code_keypresses(code: str, depth: int) -> str:
-    logger.v(code)
-    dcode = input_code(code, NPAD_MAP)
-    for _ in range(depth):
-        dcode = input_code(dcode, DPAD_MAP)
-    if logger.is_debug:
-        m = replay(dcode, depth)
-        logger.m(m)
-    return dcode
-
-
-def input_code(code: str, keymap: dict[tuple[str, str], str]) -> str:
-    pk, seq = "A", ""
-    for k in code:
-        # go to key and press A
-        seq += keymap[(pk, k)]
-        pk = k
-    return seq
+def code_keypresses(code: str, depth: int) -> int:
+    dcode = ROBOTS.numpad_sequence(code, depth)
+    n = ROBOTS.seq_cost(dcode, depth)
+    logger.v(code, dcode, n)
+    if logger.is_debug and n <= REPLAY_LIMIT:
+        logger.m(replay(ROBOTS.presses(dcode, depth), depth))
+    return n
 
 
 def sum_complexities(filename: str, depth: int = 2) -> int:
-    if depth > 15:
-        msg = f"Depth {depth} would take ages, let's not"
-        raise ValueError(msg)
-    codes = [line.rstrip() for line in lines(filename)]
-    cs = 0
-    for code in codes:
-        cs += int(code[:-1]) * len(code_keypresses(code, depth))
-    return cs
-
-
-def just_sum_complexities(filename: str, depth: int = 25) -> int:
-    codes = [line.rstrip() for line in lines(filename)]
-    dpad_dist = {k: len(v) for k, v in DPAD_MAP.items()}
-    logger.v("map", DPAD_MAP)
-    logger.v("fp", {k: input_code(v, DPAD_MAP) for k, v in DPAD_MAP.items()})
-    logger.v(dpad_dist, end="\n\n")
-    for _ in range(depth - 1):
-        dpad_dist = {
-            k: 1
-            if k[0] == k[1]
-            else (
-                dpad_dist[("A", v[0])]
-                + sum(dpad_dist[(vk, v[i + 1])] for i, vk in enumerate(v[:-1]))
-            )
-            for (k, v) in DPAD_MAP.items()
-        }
-        logger.d(dpad_dist, end="\n\n")
-
-    cs = 0
-    for code in codes:
-        dpad0 = input_code(code, NPAD_MAP)
-        logger.v(code, dpad0)
-        seqlen = dpad_dist[("A", dpad0[0])]
-        logger.d("A", dpad0[0], seqlen)
-        for i, k in enumerate(dpad0[:-1]):
-            nk = dpad0[i + 1]
-            steps = dpad_dist[(k, nk)]
-            logger.d(k, nk, steps)
-            seqlen += steps
-        logger.v(seqlen)
-        cs += int(code[:-1]) * seqlen
-    return cs
+    codes = [line.rstrip() for line in load_input(filename).lines]
+    return sum(int(code[:-1]) * code_keypresses(code, depth) for code in codes)
 
 
 def main():
     do_part_on_input(1, sum_complexities)
-    do_part_on_input(2, just_sum_complexities)
+    do_part_on_input(2, sum_complexities, depth=25)
 
 
 if __name__ == "__main__":
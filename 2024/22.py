@@ -1,14 +1,22 @@
 """--- Day 22: Monkey Market ---"""
 
-from collections import Counter, deque
-from typing import TypeAlias, cast
+import sys
+from array import array
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
-from common import do_part_on_input, lines, logger
-
-Seq: TypeAlias = tuple[int, int, int, int]
-Profits: TypeAlias = Counter[Seq]
+from common import do_part_on_input, logger, n_jobs
+from common.input_parsing import ints
 
 MAGIC_NUM = 1 << 24  # 16777216
+N_SEQS = 19**4  # Price changes are -9..9, a window of 4 is a base 19 number
+# Lanes of 64 bits fit a secret times 2048 and a secret times the 1/10 constant
+LANE_BYTES = 8
+DIV_10, DIV_10_SHIFT = 0xCCCCCCCD, 35  # x // 10 == x * DIV_10 >> 35 for x < 2**32
+# 32 bit halves of a window lane, (sequence, price) in memory order
+SEQ_WORD, PRICE_WORD = (0, 1) if sys.byteorder == "little" else (1, 0)
+BATCH_BUYERS = 1024  # Lanes per batch of price windows, bounds memory
 
 
 def update_secret_num(sn: int) -> int:
@@ -37,40 +45,124 @@ def update_secret_num(sn: int) -> int:
     return sn
 
 
-def sum_nth_secret_num(filename: str, n: int = 2000) -> int:
-    s = 0
-    for line in lines(filename):
-        sn = int(line)
-        nsn = sn
-        for _ in range(n):
-            nsn = update_secret_num(nsn)
-        logger.d(sn, nsn)
-        s += nsn
-    return s
-
-
-def price_sequence_profits(sn: int, n: int, profits: Profits):
-    seen = set()
-    pr_hist: deque[int] = deque(maxlen=4)
-    price = sn % 10
+class Buyers:
+    """
+    Secret numbers of all buyers packed into one int, one 64 bit lane each, so
+    that every update step is a handful of big int ops for all buyers at once
+    """
+
+    def __init__(self, secrets: Sequence[int]):
+        self.n = len(secrets)
+        self.ones = int.from_bytes(
+            array("Q", [1] * self.n).tobytes(), sys.byteorder
+        )  # 1 in every lane
+        self.prune = (MAGIC_NUM - 1) * self.ones
+        self.packed = int.from_bytes(array("Q", secrets).tobytes(), sys.byteorder)
+
+    def step(self):
+        """update_secret_num in every lane, the masks drop bits crossing lanes"""
+        sn, prune = self.packed, self.prune
+        sn ^= (sn << 6) & prune
+        sn ^= (sn >> 5) & prune
+        sn ^= (sn << 11) & prune
+        self.packed = sn
+
+    def prices(self) -> int:
+        sn = self.packed
+        return sn - 10 * ((sn * DIV_10 >> DIV_10_SHIFT) & self.prune)
+
+    def secrets(self) -> array:
+        lanes = array("Q")
+        lanes.frombytes(self.packed.to_bytes(self.n * LANE_BYTES, sys.byteorder))
+        return lanes
+
+
+def nth_secret_sum(secrets: Sequence[int], n: int) -> int:
+    buyers = Buyers(secrets)
+    for _ in range(n):
+        buyers.step()
+    if logger.is_debug:  # Cross-check the lanes against the scalar steps
+        for sn, nsn in zip(secrets, buyers.secrets()):
+            logger.d(sn, nsn)
+            expected = sn
+            for _ in range(n):
+                expected = update_secret_num(expected)
+            if nsn != expected:
+                raise AssertionError(f"Lane of {sn} gave {nsn}, not {expected}")
+    return sum(buyers.secrets())
+
+
+def sequence_profits(secrets: Sequence[int], n: int) -> list[int]:
+    """
+    Total price per change sequence, encoded as d1 * 19³ + d2 * 19² + d3 * 19 + d4
+    with d = change + 9. Buyers go in batches of BATCH_BUYERS lanes, so memory
+    stays at the tables plus one batch of windows however many buyers there are.
+    """
+    profits = [0] * N_SEQS
+    seen = [-1] * N_SEQS
+    for first in range(0, len(secrets), BATCH_BUYERS):
+        batch = secrets[first : first + BATCH_BUYERS]
+        add_batch_profits(batch, n, profits, seen, first)
+    return profits
+
+
+def add_batch_profits(
+    secrets: Sequence[int], n: int, profits: list[int], seen: list[int], first: int
+):
+    """
+    Each step appends (sequence, price) for every buyer in the batch as one
+    lane, then buyers are swept one at a time, stamping `seen` with the buyer
+    number (first + lane) so only its first time at each sequence counts.
+    """
+    buyers = Buyers(secrets)
+    nine = 9 * buyers.ones
+    price = buyers.prices()
+    changes = [0, 0, 0, 0]
+    windows = bytearray()
     for i in range(n):
-        sn = update_secret_num(sn)
-        new_price = sn % 10
-        pr_hist.append(new_price - price)
+        buyers.step()
+        new_price = buyers.prices()
+        changes = [*changes[1:], new_price + nine - price]
         price = new_price
         if i < 3:
             continue
-        seq = cast(Seq, tuple(pr_hist))
-        if seq not in seen:
-            profits[seq] += price
-        seen.add(seq)
+        d1, d2, d3, d4 = changes
+        seq = ((d1 * 19 + d2) * 19 + d3) * 19 + d4
+        windows += (seq | price << 32).to_bytes(buyers.n * LANE_BYTES, sys.byteorder)
+
+    words = memoryview(windows).cast("I")
+    stride = 2 * buyers.n
+    for lane in range(buyers.n):
+        seqs = words[2 * lane + SEQ_WORD :: stride]
+        prices = words[2 * lane + PRICE_WORD :: stride]
+        b = first + lane
+        for seq, p in zip(seqs, prices):
+            if seen[seq] != b:
+                seen[seq] = b
+                profits[seq] += p
+
+
+def buyer_chunks(filename: str, jobs: int) -> list[list[int]]:
+    secrets = ints(filename).tolist()
+    size = -(-len(secrets) // jobs)
+    return [secrets[i : i + size] for i in range(0, len(secrets), size)]
+
+
+def sum_nth_secret_num(filename: str, n: int = 2000) -> int:
+    jobs = n_jobs()
+    if jobs == 1:
+        return nth_secret_sum(ints(filename).tolist(), n)
+    with ProcessPoolExecutor(jobs) as pool:
+        return sum(pool.map(nth_secret_sum, buyer_chunks(filename, jobs), repeat(n)))
 
 
 def get_best_seq(filename: str, n: int = 2000) -> int:
-    profits: Profits = Counter()
-    for line in lines(filename):
-        price_sequence_profits(int(line), n, profits)
-    return max(profits.values())
+    jobs = n_jobs()
+    if jobs == 1:
+        return max(sequence_profits(ints(filename).tolist(), n))
+    with ProcessPoolExecutor(jobs) as pool:
+        chunks = pool.map(sequence_profits, buyer_chunks(filename, jobs), repeat(n))
+        return max(map(sum, zip(*chunks)))
 
 
 def main():
@@ -1,9 +1,10 @@
 """--- Day 24: Crossed Wires ---"""
 
-from collections import deque
-from collections.abc import Iterable
+import random
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass
 from functools import cached_property, reduce
+from graphlib import TopologicalSorter
 from operator import add, and_, or_, xor
 from pathlib import Path
 from typing import ClassVar, TypeAlias
@@ -75,19 +76,58 @@ def read_wires_gates(filename: str) -> tuple[Wires, Gates]:
     return wires, gates
 
 
+class Circuit:
+    """
+    Wires interned to ints and gates sorted topologically once. Values are
+    Python ints used as bit-vectors, bit k of every wire belongs to assignment
+    k, so one pass evaluates any number of inputs at once.
+    """
+
+    def __init__(self, gates: Gates):
+        graph = {out: (w1, w2) for out, (w1, w2, _) in gates.items()}
+        self.wires = list(TopologicalSorter(graph).static_order())
+        self.index = {w: i for i, w in enumerate(self.wires)}
+        self.ops: list[tuple[int, Callable[[int, int], int], int, int]] = [
+            (self.index[out], OPS[op], self.index[w1], self.index[w2])
+            for out in self.wires
+            if out in gates
+            for w1, w2, op in [gates[out]]
+        ]
+
+    def register(self, reg: str) -> list[str]:
+        """Wires of a register, least significant first"""
+        return sorted(w for w in self.wires if w.startswith(reg))
+
+    def run(self, inputs: Wires) -> Wires:
+        values = [0] * len(self.wires)
+        for wire, value in inputs.items():
+            values[self.index[wire]] = value
+        for out, op, i1, i2 in self.ops:
+            values[out] = op(values[i1], values[i2])
+        if logger.is_debug:
+            for out, op, i1, i2 in self.ops:
+                w1, w2 = self.wires[i1], self.wires[i2]
+                v1, v2 = values[i1], values[i2]
+                logger.d(w1, v1, w2, v2, op.__name__, "->", values[out])
+        return dict(zip(self.wires, values))
+
+    def adder_errors(self, pairs: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        """The (x, y) pairs that z doesn't add up right, all tested in one pass"""
+        inputs = {}
+        for reg, k in (("x", 0), ("y", 1)):
+            for i, wire in enumerate(self.register(reg)):
+                inputs[wire] = collect((pair[k] >> i) & 1 for pair in pairs)
+        out = self.run(inputs)
+        z_lanes = [out[w] for w in self.register("z")]
+        return [
+            (x, y)
+            for lane, (x, y) in enumerate(pairs)
+            if collect((z >> lane) & 1 for z in z_lanes) != x + y
+        ]
+
+
 def evaluate(wires: Wires, gates: Gates) -> Wires:
-    wires = wires.copy()
-    opq = deque((*v, k) for k, v in gates.items())
-    while opq:
-        w1, w2, op, out = opq.popleft()
-        if w1 in wires and w2 in wires:
-            v1, v2 = wires[w1], wires[w2]
-            v = OPS[op](v1, v2)
-            logger.d(w1, v1, w2, v2, op, "->", v)
-            wires[out] = v
-        else:
-            opq.append((w1, w2, op, out))
-    return wires
+    return Circuit(gates).run(wires)
 
 
 def collect(bits: Iterable[int]) -> int:
@@ -131,6 +171,17 @@ def find_corrections(gates: Gates) -> list[tuple[str, str]]:
             a, b = swap
             gates[a], gates[b] = gates[b], gates[a]
 
+    circuit = Circuit(gates)
+    n_bits = len(circuit.register("x"))
+    pairs = [
+        (random.getrandbits(n_bits), random.getrandbits(n_bits)) for _ in range(256)
+    ]
+    if errors := circuit.adder_errors(pairs):
+        raise ValueError(
+            f"Corrected circuit still fails {len(errors)} sums, e.g. {errors[0]}"
+        )
+    logger.v(f"Corrected adder checked on {len(pairs)} random sums")
+
     # write to file for visualization, ugly but ok
     with open(Path(__file__).parent / "vis" / "24.txt", "w") as file:
         file.write("\n")
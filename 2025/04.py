@@ -1,44 +1,34 @@
 """--- Day 4: Printing Department ---"""
 
 from collections.abc import Iterable
-from typing import TypeAlias
 
-from common import do_part_on_input, lines
-from common.maths import P2D, neighbors_8
+from common import do_part_on_input
+from common.grid import Grid
 
-Grid: TypeAlias = list[list[bool]]
+ROLL = ord("@")
+EMPTY = ord(".")
 
 
 def parse_rolls(filename: str) -> Grid:
-    grid = []
-    for line in lines(filename):
-        row: list[bool] = []
-        grid.append(row)
-        for c in line.strip():
-            row.append(c == "@")
-    return grid
-
-
-def get_forklift_accessible(grid: Grid) -> list[P2D]:
-    n_rows = len(grid)
-    n_cols = len(grid[0])
+    return Grid.from_input(filename, border=EMPTY)
+
+
+def get_forklift_accessible(grid: Grid) -> list[int]:
+    data = grid.data
+    d8 = grid.d8
     accessible = []
-    for i, row in enumerate(grid):
-        for j, is_roll in enumerate(row):
-            if not is_roll:
-                continue
-            adjacent_rolls = 0
-            for ni, nj in neighbors_8((i, j)):
-                if -1 < ni < n_rows and -1 < nj < n_cols:
-                    adjacent_rolls += grid[ni][nj]
-            if adjacent_rolls < 4:
-                accessible.append((i, j))
+    for idx in grid.find_all(ROLL):
+        adjacent_rolls = 0
+        for o in d8:
+            adjacent_rolls += data[idx + o] == ROLL
+        if adjacent_rolls < 4:
+            accessible.append(idx)
     return accessible
 
 
-def remove_from_grid(grid: Grid, indices: Iterable[P2D]):
-    for i, j in indices:
-        grid[i][j] = False
+def remove_from_grid(grid: Grid, indices: Iterable[int]):
+    for idx in indices:
+        grid[idx] = EMPTY
 
 
 def count_forklift_accessible(filename: str) -> int:
@@ -1,53 +1,27 @@
 """--- Day 5: Cafeteria ---"""
 
-from pathlib import Path
+from collections.abc import Iterable
 
-from common import do_part_on_input
+from common import do_part_on_input, load_input
+from common.intervals import IntervalSet
 
 
 def count_good_ingredients(filename: str) -> int:
-    ranges, ingredients = Path(filename).read_text().split("\n\n")
-    good_ranges = parse_ranges(ranges.split("\n"))
-
-    good_ingredients = 0
-    for line in ingredients.split("\n"):
-        ingredient = int(line)
-        if any(ingredient in r for r in good_ranges):
-            good_ingredients += 1
-
-    return good_ingredients
+    ranges, ingredients = load_input(filename).blocks
+    good = parse_ranges(ranges)
+    return sum(int(line) in good for line in ingredients)
 
 
 def total_good_ingredients(filename: str) -> int:
-    good_ranges = parse_ranges(Path(filename).read_text().split("\n\n")[0].split("\n"))
-    good_ranges.sort(key=lambda r: r.start)
-    merged_ranges = merge_ranges(good_ranges)
-
-    res = 0
-    for r in merged_ranges:
-        res += r.stop - r.start
-
-    return res
-
-
-def merge_ranges(ranges: list[range]) -> list[range]:
-    merged_ranges: list[range] = []
-    for i, r in enumerate(ranges):
-        if i == 0 or r.start > merged_ranges[-1].stop:
-            merged_ranges.append(r)
-            continue
-        merged_ranges[-1] = range(
-            merged_ranges[-1].start, max(r.stop, merged_ranges[-1].stop)
-        )
-    return merged_ranges
+    return len(parse_ranges(load_input(filename).blocks[0]))
 
 
-def parse_ranges(ranges: list[str]) -> list[range]:
+def parse_ranges(ranges: Iterable[str]) -> IntervalSet:
     good_ranges = []
     for line in ranges:
         st, ed = (int(e) for e in line.split("-"))
-        good_ranges.append(range(st, ed + 1))
-    return good_ranges
+        good_ranges.append((st, ed + 1))
+    return IntervalSet(good_ranges)
 
 
 def main():
@@ -2,15 +2,14 @@
 
 from functools import reduce
 from operator import add, mul
-from pathlib import Path
 
-from common import do_part_on_input, logger
+from common import do_part_on_input, load_input, logger
 
 OP = {"*": mul, "+": add}
 
 
 def grand_total(filename: str) -> int:
-    lines = Path(filename).read_text().split("\n")
+    lines = load_input(filename).lines
     operators = [OP[c] for c in lines[-1].split()]
     buffer = [int(c) for c in lines[0].split()]
     for ln in lines[1:-1]:
@@ -19,7 +18,7 @@ def grand_total(filename: str) -> int:
 
 
 def right_to_left_sum(filename: str) -> int:
-    lines = Path(filename).read_text().split("\n")
+    lines = load_input(filename).lines
     operators = lines[-1]
     operands = lines[:-1]
     res = 0
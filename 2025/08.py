@@ -1,22 +1,22 @@
 """--- Day 8: Playground ---"""
 
-from math import prod, sqrt
+from collections import defaultdict
+from collections.abc import Iterator
+from itertools import product
+from math import isqrt, prod
 
 from common import P3D, do_part_on_input, lines, logger
+from common.dsu import DisjointSet
 from common.input_parsing import USE_SMALL_FILE
 
+NEIGHBOR_CELLS = list(product((-1, 0, 1), repeat=3))
+
 
 class JunctionBoxConnections:
     def __init__(self, boxes: list[P3D]) -> None:
         self.boxes = boxes
-
-        self.unconnected = set(range(len(boxes)))
-        # Map of circuit id to list of jbox indices
-        self.circuits: dict[int, set[int]] = {}
-        # Map of jbox indices to circuit id
-        self.jbc_map: dict[int, int] = {}
-        self.distances = sorted(calc_distances(self.boxes), reverse=True)
-        logger.d(*self.distances, sep="\n")
+        self.circuits = DisjointSet(len(boxes))
+        self.pairs = closest_pairs(boxes)
 
     @classmethod
     def from_csv(cls, filename: str):
@@ -24,72 +24,69 @@ class JunctionBoxConnections:
             [tuple(int(i) for i in line.strip().split(",")) for line in lines(filename)]  # type: ignore
         )
 
-    def connect_pair(self, a: int, b: int) -> None:
-        if circ_a := self.jbc_map.get(a):
-            if circ_b := self.jbc_map.get(b):
-                if circ_a == circ_b:
-                    logger.d(a, "and", b, "both in", circ_a, "nothing new")
-                    return  # Do nothing
-                else:
-                    self._merge_circuits(circ_a, circ_b)
-            else:
-                self._connect_box(b, circ_a)
-        elif circ_b := self.jbc_map.get(b):
-            self._connect_box(a, circ_b)
-        else:
-            new_circ_id = self.boxes[a][0]
-            while new_circ_id in self.circuits:
-                new_circ_id *= 10
-            self.circuits[new_circ_id] = set()
-            self._connect_box(a, new_circ_id)
-            self._connect_box(b, new_circ_id)
-
-    def _merge_circuits(self, circ_a: int, circ_b: int) -> None:
-        b_circuit = self.circuits.pop(circ_b)
-        self.circuits[circ_a] |= b_circuit
-        for box in b_circuit:
-            self.jbc_map[box] = circ_a
-        logger.d("merged circuits", circ_a, "and", circ_b)
-
-    def _connect_box(self, box_index: int, circuit_id: int) -> None:
-        logger.d(box_index, "added to", circuit_id)
-        self.jbc_map[box_index] = circuit_id
-        self.circuits[circuit_id].add(box_index)
-        self.unconnected.remove(box_index)
-
     def connect_closest_pair(self) -> tuple[int, int]:
-        if not self.distances:
+        d2, a, b = next(self.pairs, (0, -1, -1))
+        if a == -1:
             raise ValueError("Tried to connect more than there are jbox pairs")
-        _dist, a, b = self.distances.pop()
-        self.connect_pair(a, b)
+        if not self.circuits.union(a, b):
+            logger.d(a, "and", b, "already connected, nothing new")
         if logger.is_debug:
-            logger.m(f"{self.boxes[a]!s:<15} ─── {self.boxes[b]}")
+            logger.m(f"{self.boxes[a]!s:<15} ─── {self.boxes[b]}  √{d2}")
         return a, b
 
     def connect_all(self) -> tuple[P3D, P3D]:
-        while self.unconnected or len(self.circuits) > 1:
+        while len(self.circuits) > 1:
             a, b = self.connect_closest_pair()
         return self.boxes[a], self.boxes[b]
 
 
-def dist(a: P3D, b: P3D) -> float:
-    return sqrt(sum((ai - bi) ** 2 for ai, bi in zip(a, b)))
-
-
-def calc_distances(points: list[P3D]) -> list[tuple[float, int, int]]:
-    return [
-        (dist(a, points[j]), i, j)
-        for i, a in enumerate(points)
-        for j in range(i + 1, len(points))
-    ]
+def dist2(a: P3D, b: P3D) -> int:
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+def closest_pairs(points: list[P3D]) -> Iterator[tuple[int, int, int]]:
+    """
+    (squared distance, i, j) for i < j, closest first, generated in shells of
+    doubling radius. Each shell buckets points into cubes the size of its radius,
+    so only pairs in neighbouring cubes are measured and only one shell of pairs
+    is held at a time.
+    """
+    if len(points) < 2:
+        return
+    spans = [max(c) - min(c) for c in zip(*points)]
+    max_dist2 = sum(s * s for s in spans)
+    # About the typical spacing between neighbours
+    radius = max(1, int((prod(max(s, 1) for s in spans) / len(points)) ** (1 / 3)))
+    low2 = 0
+    while low2 <= max_dist2:
+        high2 = radius * radius
+        cells: defaultdict[tuple[int, int, int], list[int]] = defaultdict(list)
+        for i, (x, y, z) in enumerate(points):
+            cells[x // radius, y // radius, z // radius].append(i)
+        shell = []
+        for (cx, cy, cz), members in cells.items():
+            for dx, dy, dz in NEIGHBOR_CELLS:
+                for j in cells.get((cx + dx, cy + dy, cz + dz), ()):
+                    pj = points[j]
+                    for i in members:
+                        if i < j and low2 <= (d2 := dist2(points[i], pj)) < high2:
+                            shell.append((d2, i, j))
+        shell.sort()
+        logger.d(f"{len(shell)} pairs within √{low2}..{isqrt(high2)}")
+        yield from shell
+        low2 = high2
+        radius *= 2
 
 
 def part1(filename: str, cables: int) -> int:
     connections = JunctionBoxConnections.from_csv(filename)
     for i in range(cables):
         connections.connect_closest_pair()
-        logger.v(i, "circuits:", connections.circuits)
-    return prod(sorted(len(c) for c in connections.circuits.values())[-3:])
+        if logger.is_verbose:
+            logger.v(i, "circuits:", connections.circuits.sets())
+    sizes = connections.circuits.size
+    roots = {connections.circuits.find(box) for box in range(len(sizes))}
+    return prod(sorted(sizes[r] for r in roots)[-3:])
 
 
 def part2(filename: str) -> int:
@@ -1,18 +1,23 @@
+import os
+from contextlib import ExitStack
 from sys import argv
+from time import process_time
 from typing import Any, Callable, ParamSpec, TypeVar
 
 from .ansi import CODES as ANSICODES
 from .ansi import Ansi
-from .input_parsing import argv_input_file, lines
+from .input_parsing import argv_input_file, lines, load_input
 from .logging import TheLogger
 from .maths import P2D, P3D, tuple_ranges
+from .profiling import PROFILE_DIR, profiled, traced_memory
+from .records import emit, main_module
 
 T = TypeVar("T")
 P = ParamSpec("P")
 
 
 # Instantiate logger and input file from cli arguments
-# NOTE: cli arguments are undocumented, .input_parsing and .logging just pick them up
+# NOTE: cli arguments are undocumented, .input_parsing/.logging/.records pick them up
 logger = TheLogger.from_argv()
 
 
@@ -20,6 +25,28 @@ def skip_part(part) -> bool:
     return f"-{part}" in argv
 
 
+def bench_parts() -> bool:
+    return "-B" in argv
+
+
+def profile_parts() -> bool:
+    return "-P" in argv
+
+
+def trace_memory() -> bool:
+    return "-M" in argv
+
+
+def n_jobs() -> int:
+    """Worker processes for days that can fan out, `-j N` (0 for one per core)"""
+    if "-j" not in argv:
+        return 1
+    next_arg = argv.index("-j") + 1
+    if next_arg >= len(argv) or not argv[next_arg].isdigit():
+        raise SyntaxError("-j must be followed by a number of jobs")
+    return int(argv[next_arg]) or os.cpu_count() or 1
+
+
 def do_part_on_input(
     part: int,
     sol: Callable[..., int | str],
@@ -60,13 +87,45 @@ def label_call(
     *args: P.args,
     **kwargs: P.kwargs,
 ) -> T:
-    logger.lap()
-    res = func(*args, **kwargs)
+    bench = bench_parts()
+    extra: dict[str, Any] = {}
+    memory = None
+    with ExitStack() as stack:
+        if profile_parts():
+            prof_file = PROFILE_DIR / f"{main_module()}.{label}.prof"
+            stack.enter_context(profiled(prof_file))
+            extra["prof"] = str(prof_file)
+        if trace_memory():
+            memory = stack.enter_context(traced_memory())
+
+        if bench:
+            # NOTE: func is called repeatedly, so it must not consume its arguments
+            stats = logger.bench(func, *args, **kwargs)
+            res = stats.result
+            wall_ms, cpu_ms = stats.median_ms, stats.cpu_ms
+            extra["bench"] = stats.as_dict()
+        else:
+            logger.lap()
+            cpu_start = process_time()
+            res = func(*args, **kwargs)
+            wall_ms = logger.ms()
+            cpu_ms = (process_time() - cpu_start) * 1000
+
+    if memory is not None:
+        extra["peak_traced_kb"] = round(memory.peak_kb, 1)
+    emit(label, wall_ms, cpu_ms, res if with_result else None, **extra)
+
     if always or logger.is_verbose:
         if with_result:
-            logger.i(f"{label}: {res}")
+            logger.i(f"{label}: {res}", _skip_ts=bench)
         else:
-            logger.i(label)
+            logger.i(label, _skip_ts=bench)
+    if "prof" in extra:
+        logger.i(f"{label} profile: {extra['prof']}", _skip_ts=True)
+    if memory is not None:
+        logger.i(f"{label} peak traced memory: {memory.peak_kb:.1f} KiB", _skip_ts=True)
+        for line in memory.lines():
+            logger.i(line, _skip_ts=True)
     return res
 
 
@@ -75,6 +134,7 @@ __all__ = (
     "argv_input_file",
     "ANSICODES",
     "lines",
+    "load_input",
     "logger",
     "P2D",
     "P3D",
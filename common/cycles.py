@@ -0,0 +1,101 @@
+"""
+Cycle detection for simulations that end up repeating a state, so that
+billions of steps reduce to start + length steps.
+
+    cycle = find_cycle(step, state, key=bytes)
+    cycle.fast_forward(1_000_000_000)
+"""
+
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from hashlib import blake2b
+from itertools import count
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class Cycle(Generic[T]):
+    start: int  # Steps before the first state in the cycle
+    length: int
+    steps: int  # Steps taken to reach `state`, which is in the cycle
+    state: T
+    step: Callable[[T], T]
+
+    def reduce(self, n: int) -> int:
+        """Fewest steps giving the same state as n steps"""
+        if n < self.start:
+            return n
+        return self.start + (n - self.start) % self.length
+
+    def fast_forward(self, n: int) -> T:
+        """State after n steps, stepping at most length - 1 times"""
+        if n < self.start:
+            raise ValueError(f"Step {n} is before the cycle starts at {self.start}")
+        state = self.state
+        for _ in range((n - self.steps) % self.length):
+            state = self.step(state)
+        return state
+
+
+def _digest(key: Hashable) -> bytes:
+    data = key if isinstance(key, (bytes, bytearray)) else repr(key).encode()
+    return blake2b(data, digest_size=16).digest()
+
+
+def find_cycle(
+    step: Callable[[T], T],
+    state: T,
+    key: Callable[[T], Hashable] | None = None,
+    brent: bool = False,
+    fingerprint: bool = False,
+) -> Cycle[T]:
+    """
+    Step from state until it repeats, comparing states by key(state).
+    By default key(state) of every step is kept, so pass a compact key for
+    big states. With fingerprint, a 16 byte blake2b digest of the key (its
+    bytes, or its repr otherwise) is kept instead, so memory per step is fixed
+    and a false repeat needs a 128 bit collision. With brent, only two states
+    are kept (Brent's algorithm), at the cost of stepping about twice as
+    often, and step must return a new state rather than modify its argument.
+    """
+    key_of = key or (lambda s: s)
+    if brent:
+        return _brent(step, state, key_of)
+
+    seen: dict[Hashable, int] = {}
+    for i in count():
+        fp = _digest(key_of(state)) if fingerprint else key_of(state)
+        if fp in seen:
+            return Cycle(seen[fp], i - seen[fp], i, state, step)
+        seen[fp] = i
+        state = step(state)
+    raise AssertionError("unreachable")
+
+
+def _brent(step: Callable[[T], T], state: T, key: Callable[[T], Hashable]) -> Cycle[T]:
+    # Find the length with the tortoise waiting at powers of two
+    power = length = 1
+    tortoise, t_key = state, key(state)
+    hare = step(state)
+    h_key = key(hare)
+    while t_key != h_key:
+        if power == length:
+            tortoise, t_key = hare, h_key
+            power *= 2
+            length = 0
+        hare = step(hare)
+        h_key = key(hare)
+        length += 1
+
+    # Then the start with both walking, length steps apart
+    tortoise = hare = state
+    for _ in range(length):
+        hare = step(hare)
+    start = 0
+    while key(tortoise) != key(hare):
+        tortoise = step(tortoise)
+        hare = step(hare)
+        start += 1
+    return Cycle(start, length, start, tortoise, step)
@@ -0,0 +1,44 @@
+class DisjointSet:
+    """Union-find over 0..n-1 with union by size and path compression"""
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.size = [1] * n
+        self.n_sets = n
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge the sets of a and b, False if they were already one"""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        self.n_sets -= 1
+        return True
+
+    def connected(self, a: int, b: int) -> bool:
+        return self.find(a) == self.find(b)
+
+    def set_size(self, x: int) -> int:
+        return self.size[self.find(x)]
+
+    def sets(self) -> dict[int, list[int]]:
+        """Members of every set by root"""
+        sets: dict[int, list[int]] = {}
+        for x in range(len(self.parent)):
+            sets.setdefault(self.find(x), []).append(x)
+        return sets
+
+    def __len__(self) -> int:
+        return self.n_sets
@@ -0,0 +1,123 @@
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from .input_parsing import load_input
+from .maths import D4, DIRECTIONS, P2D
+
+Cell = int | str | bytes
+
+
+def as_byte(value: Cell) -> int:
+    if isinstance(value, int):
+        return value
+    if len(value) != 1:
+        raise ValueError(f"Expected a single character, got {value!r}")
+    return ord(value)
+
+
+class Grid:
+    """
+    2D grid of characters stored row-major in one flat bytearray, surrounded by a
+    one cell border of `border` so that every neighbour of an inside cell is a
+    valid index. Cells are addressed by flat index, idx = (i + 1) * stride + j + 1,
+    and neighbours are idx + offset, see `d4`/`d8` (same order as D4/DIRECTIONS).
+    """
+
+    def __init__(self, rows: Iterable[str | bytes], border: Cell = 0):
+        encoded = [r.encode() if isinstance(r, str) else bytes(r) for r in rows]
+        self.height = len(encoded)
+        self.width = len(encoded[0]) if encoded else 0
+        if any(len(r) != self.width for r in encoded):
+            raise ValueError("Grid rows must all have the same length")
+        self.border = as_byte(border)
+        self.stride = self.width + 2
+        edge = bytes([self.border])
+        self.data = bytearray(edge * self.stride)
+        for r in encoded:
+            self.data += edge + r + edge
+        self.data += edge * self.stride
+
+        self.d4 = tuple(di * self.stride + dj for di, dj in D4)
+        self.d8 = tuple(di * self.stride + dj for di, dj in DIRECTIONS)
+
+    @classmethod
+    def from_input(cls, filename: Path | str, border: Cell = 0) -> "Grid":
+        return cls(load_input(filename).grid, border)
+
+    def copy(self) -> "Grid":
+        new = object.__new__(Grid)
+        new.__dict__.update(self.__dict__)
+        new.data = self.data[:]
+        return new
+
+    # Indexing
+    def idx(self, p: P2D) -> int:
+        return (p[0] + 1) * self.stride + p[1] + 1
+
+    def pos(self, idx: int) -> P2D:
+        i, j = divmod(idx, self.stride)
+        return i - 1, j - 1
+
+    def in_bounds(self, idx: int) -> bool:
+        i, j = divmod(idx, self.stride)
+        return 0 < i <= self.height and 0 < j <= self.width
+
+    def __getitem__(self, idx: int) -> int:
+        return self.data[idx]
+
+    def __setitem__(self, idx: int, value: Cell):
+        self.data[idx] = as_byte(value)
+
+    def indices(self) -> Iterator[int]:
+        """Flat indices of all inside cells, row by row"""
+        for i in range(1, self.height + 1):
+            start = i * self.stride + 1
+            yield from range(start, start + self.width)
+
+    # Neighbours
+    def neighbors_4(self, idx: int) -> Iterator[int]:
+        return (idx + o for o in self.d4)
+
+    def neighbors_8(self, idx: int) -> Iterator[int]:
+        return (idx + o for o in self.d8)
+
+    # Search
+    def find(self, value: Cell, start: int = 0) -> int:
+        """Flat index of the first `value` from `start`, -1 if none"""
+        return self.data.find(as_byte(value), start)
+
+    def find_all(self, value: Cell) -> list[int]:
+        b = as_byte(value)
+        if b == self.border:
+            return [idx for idx in self.indices() if self.data[idx] == b]
+        found = []
+        idx = self.data.find(b)
+        while idx != -1:
+            found.append(idx)
+            idx = self.data.find(b, idx + 1)
+        return found
+
+    def count(self, value: Cell) -> int:
+        b = as_byte(value)
+        n = self.data.count(b)
+        if b == self.border:
+            n -= 2 * (self.stride + self.height)
+        return n
+
+    # Views
+    def row(self, i: int) -> bytes:
+        start = (i + 1) * self.stride + 1
+        return bytes(self.data[start : start + self.width])
+
+    def col(self, j: int) -> bytes:
+        start = self.stride + j + 1
+        return bytes(self.data[start : start + self.height * self.stride : self.stride])
+
+    def rows(self) -> list[bytes]:
+        return [self.row(i) for i in range(self.height)]
+
+    def __str__(self) -> str:
+        return "\n".join(r.decode() for r in self.rows())
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.height}×{self.width})"
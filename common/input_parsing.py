@@ -1,12 +1,17 @@
 import re
-from functools import cache
+from array import array
+from collections.abc import Iterator
+from functools import cache, cached_property
+from mmap import ACCESS_READ, mmap
 from pathlib import Path
 from sys import argv
-from typing import Generator
+from typing import Generator, overload
 
 import __main__
 
 RE_NUM = re.compile(r"-?\d+")
+RE_NUM_BYTES = re.compile(rb"-?\d+")
+NUM_BYTES = frozenset(b"-0123456789")
 
 USE_SMALL_FILE = "-s" in argv
 
@@ -58,3 +63,138 @@ def re_2d(s: str) -> tuple[int, int]:
 def re_4d(s: str) -> tuple[int, int, int, int]:
     n = [int(m) for m in RE_NUM.findall(s)]
     return n[0], n[1], n[2], n[3]
+
+
+class Input:
+    """
+    A memory mapped input file with cached views, from load_input.
+    The views are immutable since they are shared by every caller.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        stat = path.stat()
+        self.stamp = (stat.st_mtime_ns, stat.st_size)
+        self._mmap: mmap | None = None
+        if stat.st_size:  # Can't map an empty file
+            with open(path, "rb") as f:
+                self._mmap = mmap(f.fileno(), 0, access=ACCESS_READ)
+
+    @property
+    def data(self) -> memoryview:
+        """Zero-copy view of the raw bytes, works with bytes regexes"""
+        return memoryview(self._mmap if self._mmap is not None else b"")
+
+    @cached_property
+    def text(self) -> str:
+        return str(self.data, "utf-8")
+
+    @cached_property
+    def lines(self) -> tuple[str, ...]:
+        """Lines without line endings"""
+        return tuple(self.text.splitlines())
+
+    @cached_property
+    def blocks(self) -> tuple[tuple[str, ...], ...]:
+        """Lines grouped by blank lines"""
+        blocks: list[tuple[str, ...]] = []
+        block: list[str] = []
+        for line in self.lines:
+            if line.strip():
+                block.append(line)
+            elif block:
+                blocks.append(tuple(block))
+                block = []
+        if block:
+            blocks.append(tuple(block))
+        return tuple(blocks)
+
+    @cached_property
+    def grid(self) -> tuple[str, ...]:
+        """Rows of a rectangular grid, ignoring trailing blank lines"""
+        rows = self.lines
+        while rows and not rows[-1].strip():
+            rows = rows[:-1]
+        if any(len(row) != len(rows[0]) for row in rows):
+            raise ValueError(f"{self.path.name} is not a rectangular grid")
+        return rows
+
+    def close(self):
+        if self._mmap is None:
+            return
+        try:
+            self._mmap.close()
+        except BufferError:  # Someone still holds a view, let GC unmap it
+            pass
+        self._mmap = None
+
+
+_INPUTS: dict[Path, Input] = {}
+
+
+def load_input(filename: Path | str) -> Input:
+    """Cached Input for filename, reloaded if the file changed since"""
+    path = Path(filename).resolve()
+    stat = path.stat()
+    cached = _INPUTS.get(path)
+    if cached is not None:
+        if cached.stamp == (stat.st_mtime_ns, stat.st_size):
+            return cached
+        cached.close()
+    _INPUTS[path] = Input(path)
+    return _INPUTS[path]
+
+
+@overload
+def ints(filename: Path | str) -> array: ...
+@overload
+def ints(filename: Path | str, per_line: int) -> memoryview: ...
+def ints(filename: Path | str, per_line: int | None = None) -> array | memoryview:
+    """
+    All integers in the file, parsed in one pass over the mapped bytes, as array('q').
+    per_line: numbers per line k, gives an (n, k) row-major view of the array instead
+        (m[i, j], m.tolist() -> [[...], ...]), only checks the total is divisible by k
+    """
+    nums = array("q", map(int, RE_NUM_BYTES.findall(load_input(filename).data)))
+    if per_line is None:
+        return nums
+    if len(nums) % per_line:
+        msg = f"{len(nums)} numbers in {filename} don't split into rows of {per_line}"
+        raise ValueError(msg)
+    return memoryview(nums).cast("B").cast("q", (len(nums) // per_line, per_line))
+
+
+def int_rows(filename: Path | str, per_line: int) -> list[tuple[int, ...]]:
+    """ints(filename, per_line) as a list of row tuples"""
+    nums = ints(filename)
+    if len(nums) % per_line:
+        msg = f"{len(nums)} numbers in {filename} don't split into rows of {per_line}"
+        raise ValueError(msg)
+    return list(zip(*[iter(nums)] * per_line))
+
+
+def iter_ints(
+    filename: Path | str, per_line: int | None = None, chunk_size: int = 1 << 20
+) -> Iterator[int] | Iterator[tuple[int, ...]]:
+    """
+    Stream the integers in a file too large to hold, reading chunk_size bytes at a
+    time, yielding ints or tuples of per_line ints.
+    """
+    nums = _iter_ints(filename, chunk_size)
+    if per_line is None:
+        return nums
+    return zip(*[nums] * per_line, strict=True)
+
+
+def _iter_ints(filename: Path | str, chunk_size: int) -> Iterator[int]:
+    tail = b""
+    with open(filename, "rb") as f:
+        while chunk := f.read(chunk_size):
+            buf = tail + chunk
+            # A number cut by the chunk boundary waits for the next chunk
+            cut = len(buf)
+            while cut and buf[cut - 1] in NUM_BYTES:
+                cut -= 1
+            yield from map(int, RE_NUM_BYTES.findall(buf, 0, cut))
+            tail = buf[cut:]
+    yield from map(int, RE_NUM_BYTES.findall(tail))
@@ -0,0 +1,183 @@
+"""
+Sets of integers as sorted disjoint half-open intervals [lo, hi), and
+piecewise offset maps over the integers (e.g. almanac maps, 2023/05).
+"""
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Iterable, Iterator
+from itertools import pairwise
+
+Interval = tuple[int, int]  # [lo, hi)
+INF = float("inf")
+
+
+def _combine(a: list[int], b: list[int], keep: Callable[[bool, bool], bool]):
+    """Bounds of the set of points where keep(in a, in b), one sweep over both"""
+    out = []
+    i = j = 0
+    in_a = in_b = inside = False
+    while i < len(a) or j < len(b):
+        x = min(a[i] if i < len(a) else INF, b[j] if j < len(b) else INF)
+        if i < len(a) and a[i] == x:
+            in_a = not in_a
+            i += 1
+        if j < len(b) and b[j] == x:
+            in_b = not in_b
+            j += 1
+        if keep(in_a, in_b) != inside:
+            inside = not inside
+            out.append(x)
+    return out
+
+
+class IntervalSet:
+    """
+    Integers as sorted disjoint intervals, kept as one flat list of bounds
+    [lo0, hi0, lo1, hi1, ...], so x is in the set iff an odd number of bounds
+    are <= x. Touching intervals are merged.
+    """
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        self.bounds: list[int] = []
+        for lo, hi in sorted(intervals):
+            if lo >= hi:
+                continue
+            if self.bounds and lo <= self.bounds[-1]:
+                self.bounds[-1] = max(self.bounds[-1], hi)
+            else:
+                self.bounds += (lo, hi)
+
+    @classmethod
+    def from_ranges(cls, ranges: Iterable[range]) -> "IntervalSet":
+        return cls((r.start, r.stop) for r in ranges)
+
+    @classmethod
+    def _from_bounds(cls, bounds: list[int]) -> "IntervalSet":
+        new = cls()
+        new.bounds = bounds
+        return new
+
+    def add(self, lo: int, hi: int):
+        if lo >= hi:
+            return
+        i = bisect_left(self.bounds, lo)
+        j = bisect_right(self.bounds, hi)
+        self.bounds[i:j] = [lo] * (i % 2 == 0) + [hi] * (j % 2 == 0)
+
+    def __contains__(self, x: int) -> bool:
+        return bisect_right(self.bounds, x) % 2 == 1
+
+    def __or__(self, other: "IntervalSet") -> "IntervalSet":
+        return self._from_bounds(_combine(self.bounds, other.bounds, bool.__or__))
+
+    def __and__(self, other: "IntervalSet") -> "IntervalSet":
+        return self._from_bounds(_combine(self.bounds, other.bounds, bool.__and__))
+
+    def __sub__(self, other: "IntervalSet") -> "IntervalSet":
+        return self._from_bounds(
+            _combine(self.bounds, other.bounds, lambda a, b: a and not b)
+        )
+
+    union = __or__
+    intersection = __and__
+    difference = __sub__
+
+    def intervals(self) -> Iterator[Interval]:
+        b = self.bounds
+        return zip(b[::2], b[1::2])
+
+    def ranges(self) -> list[range]:
+        return [range(lo, hi) for lo, hi in self.intervals()]
+
+    @property
+    def start(self) -> int:
+        return self.bounds[0]
+
+    @property
+    def stop(self) -> int:
+        return self.bounds[-1]
+
+    def __len__(self) -> int:
+        """Number of integers in the set"""
+        return sum(hi - lo for lo, hi in self.intervals())
+
+    def __bool__(self) -> bool:
+        return bool(self.bounds)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, IntervalSet) and self.bounds == other.bounds
+
+    def __repr__(self) -> str:
+        inner = ", ".join(f"[{lo}, {hi})" for lo, hi in self.intervals())
+        return f"{self.__class__.__name__}({inner})"
+
+
+class RangeMap:
+    """
+    x -> x + offset, with the offset constant between breakpoints and 0
+    outside all of the given ranges. offsets[k] applies from bounds[k - 1]
+    (or -∞) up to bounds[k] (or ∞).
+    """
+
+    def __init__(self, ranges: Iterable[tuple[int, int, int]] = ()):
+        """ranges: disjoint (lo, hi, offset)"""
+        pieces: list[tuple[float, float, int]] = []
+        last = -INF
+        for lo, hi, offset in sorted(ranges):
+            if lo < last:
+                raise ValueError(f"Overlapping ranges at {lo}")
+            pieces += [(last, lo, 0), (lo, hi, offset)]
+            last = hi
+        pieces.append((last, INF, 0))
+        self._set_pieces(pieces)
+
+    def _set_pieces(self, pieces: Iterable[tuple[float, float, int]]):
+        """Sorted pieces covering -∞..∞, merging neighbours with equal offsets"""
+        self.bounds: list[int] = []
+        self.offsets: list[int] = []
+        for lo, hi, offset in pieces:
+            if lo >= hi:
+                continue
+            if self.offsets and self.offsets[-1] == offset:
+                self.bounds[-1] = hi  # type: ignore[call-overload]
+            else:
+                self.bounds.append(hi)  # type: ignore[arg-type]
+                self.offsets.append(offset)
+        self.bounds.pop()  # ∞
+
+    def pieces(self) -> Iterator[tuple[float, float, int]]:
+        return zip([-INF, *self.bounds], [*self.bounds, INF], self.offsets)
+
+    def __call__(self, x: int) -> int:
+        return x + self.offsets[bisect_right(self.bounds, x)]
+
+    def then(self, other: "RangeMap") -> "RangeMap":
+        """The map x -> other(self(x)) as one RangeMap"""
+        pieces = []
+        for lo, hi, offset in self.pieces():
+            # Split the image of the piece where the other map's offset changes
+            k = bisect_right(other.bounds, lo + offset)
+            cuts = [lo + offset, *other.bounds[k:], hi + offset]
+            for (a, b), o2 in zip(pairwise(cuts), other.offsets[k:]):
+                if a >= hi + offset:
+                    break
+                pieces.append((a - offset, min(b, hi + offset) - offset, offset + o2))
+        new = RangeMap()
+        new._set_pieces(pieces)
+        return new
+
+    def map_intervals(self, intervals: IntervalSet) -> IntervalSet:
+        """Image of the set, binary searching for the first piece of each interval"""
+        out = []
+        for lo, hi in intervals.intervals():
+            k = bisect_right(self.bounds, lo)
+            cuts = [lo, *self.bounds[k:], hi]
+            for (a, b), offset in zip(pairwise(cuts), self.offsets[k:]):
+                if a >= hi:
+                    break
+                out.append((a + offset, min(b, hi) + offset))
+        return IntervalSet(out)
+
+    def __repr__(self) -> str:
+        inner = ", ".join(f"[{lo}, {hi}) {o:+}" for lo, hi, o in self.pieces() if o)
+        return f"{self.__class__.__name__}({inner})"
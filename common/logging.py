@@ -1,8 +1,11 @@
+import gc
 import sys
+from dataclasses import dataclass
 from pathlib import Path
+from statistics import median, quantiles, stdev
 from sys import argv
-from time import perf_counter, sleep
-from typing import Callable, Literal, TypeAlias, cast
+from time import perf_counter, process_time, sleep
+from typing import Any, Callable, Literal, TypeAlias, cast
 
 from .ansi import (
     BG_WHITE,
@@ -21,10 +24,57 @@ from .ansi import (
 )
 
 Level: TypeAlias = Literal["i", "v", "u"]
+
+BENCH_SAMPLE_S = 0.01
+BENCH_MIN_SAMPLES = 5
+BENCH_MAX_SAMPLES = 1000
 LEVEL_MAP: dict[Level, int] = {"i": 1, "v": 2, "u": 3}
 LEVEL_FMT = {1: [BRIGHT_YELLOW, BLINK], 2: [BRIGHT_BLUE], 3: [MAGENTA]}
 
 
+@dataclass
+class BenchStats:
+    name: str
+    times_ms: list[float]  # Per call, one per sample
+    number: int  # Calls per sample
+    cpu_ms: float  # Mean per call
+    result: Any
+
+    @property
+    def min_ms(self) -> float:
+        return min(self.times_ms)
+
+    @property
+    def median_ms(self) -> float:
+        return median(self.times_ms)
+
+    @property
+    def p95_ms(self) -> float:
+        if len(self.times_ms) < 2:
+            return self.times_ms[0]
+        return quantiles(self.times_ms, n=20)[-1]
+
+    @property
+    def stdev_ms(self) -> float:
+        return stdev(self.times_ms) if len(self.times_ms) > 1 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"min={self.min_ms:.3f} p95={self.p95_ms:.3f} σ={self.stdev_ms:.3f} ms"
+            f" n={len(self.times_ms)}×{self.number}"
+        )
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "min_ms": round(self.min_ms, 4),
+            "median_ms": round(self.median_ms, 4),
+            "p95_ms": round(self.p95_ms, 4),
+            "stdev_ms": round(self.stdev_ms, 4),
+            "samples": len(self.times_ms),
+            "number": self.number,
+        }
+
+
 class TheLogger:
     _instance = None
 
@@ -151,35 +201,102 @@ class TheLogger:
     def d(self, *args, sep: str = " ", end: str = "\n", **kwargs):
         self.log(3, *args, sep=sep, end=end, **kwargs)
 
-    def bench(self, func: Callable, *args, _n_runs: int = 1000, **kwargs):
-        s = 0.0
-        part = _n_runs // 50
-        with Ansi(MAGENTA, BG_WHITE):
-            for i in range(_n_runs):
-                if i and not i % part:
-                    n = i // part
-                    est = f"~{1 + s * (_n_runs - i) / i // 1000:.0f}s"
-                    print(" " * n + "█" * (50 - n) + f"{est:>5} ", end="\r")
-                self.lap()
-                func(*args, **kwargs)
-                s += self.ms()
+    def bench(
+        self,
+        func: Callable,
+        *args,
+        _n_runs: int | None = None,
+        _warmup: int = 1,
+        _budget_s: float = 1.0,
+        **kwargs,
+    ) -> "BenchStats":
+        """
+        Time func(*args, **kwargs) with the GC disabled, after `_warmup` calls.
+        Each sample times a loop of calls, calibrated so a sample takes at least
+        BENCH_SAMPLE_S, with as many samples as fit in `_budget_s` (at least
+        BENCH_MIN_SAMPLES). `_n_runs` instead gives that many single call samples.
+        """
+        result = None
+        for _ in range(_warmup):
+            result = func(*args, **kwargs)
+
+        def timed(number: int) -> float:
+            nonlocal result
+            t0 = perf_counter()
+            for _ in range(number):
+                result = func(*args, **kwargs)
+            return perf_counter() - t0
+
+        gc_was_enabled = gc.isenabled()
+        gc.collect()
+        gc.disable()
+        try:
+            if _n_runs is not None:
+                number, n_samples = 1, _n_runs
+            else:
+                number, sample_s = self._autorange(timed)
+                n_samples = min(
+                    BENCH_MAX_SAMPLES,
+                    max(BENCH_MIN_SAMPLES, int(_budget_s / sample_s)),
+                )
+            times_ms: list[float] = []
+            cpu_start = process_time()
+            bar = max(1, n_samples // 50)
+            with Ansi(MAGENTA, BG_WHITE):
+                for i in range(n_samples):
+                    if i and not i % bar:
+                        n = 50 * i // n_samples
+                        left = sum(times_ms) * number * (n_samples - i) / i / 1000
+                        print(
+                            " " * n + "█" * (50 - n) + f"{f'~{1 + left:.0f}s':>5} ",
+                            end="\r",
+                        )
+                    times_ms.append(timed(number) * 1000 / number)
+            cpu_ms = (process_time() - cpu_start) * 1000 / (n_samples * number)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        stats = BenchStats(func.__name__, times_ms, number, cpu_ms, result)
         fmt = Ansi.e(BRIGHT_BLUE, ITALIC)
         comma = RST + ", " + fmt
         print(
-            Ansi.fmt(self._ts(f"µ={s / _n_runs:.2f} ms"), [MAGENTA]),
+            Ansi.fmt(self._ts(f"med={stats.median_ms:.2f} ms"), [MAGENTA]),
             func.__name__ + "(",
             "".join(
                 [
                     fmt,
-                    comma.join(a.name if isinstance(a, Path) else str(a) for a in args)
+                    comma.join(self._fmt_arg(a) for a in args)
                     + comma * bool(kwargs)
-                    + comma.join(f"{RST + k + fmt}={a}" for k, a in kwargs.items()),
+                    + comma.join(
+                        f"{RST + k + fmt}={self._fmt_arg(a)}" for k, a in kwargs.items()
+                    ),
                     RST,
                 ]
             ),
-            ")",
+            ") ",
+            Ansi.fmt(stats.summary(), [ITALIC]),
             sep="",
         )
+        return stats
+
+    @staticmethod
+    def _autorange(timed: Callable[[int], float]) -> tuple[int, float]:
+        """Smallest number of calls in 1, 2, 5, 10, 20, ... filling a sample"""
+        number = 1
+        while True:
+            for k in (1, 2, 5):
+                t = timed(number * k)
+                if t >= BENCH_SAMPLE_S:
+                    return number * k, t
+            number *= 10
+
+    @staticmethod
+    def _fmt_arg(arg) -> str:
+        if isinstance(arg, str) and Path(arg).is_file():
+            arg = Path(arg)
+        s = arg.name if isinstance(arg, Path) else str(arg)
+        return s if len(s) <= 24 else s[:23] + "…"
 
     @staticmethod
     def get_level_from_argv():
@@ -0,0 +1,100 @@
+import contextlib
+import cProfile
+import threading
+import tracemalloc
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+PROFILE_DIR = ROOT / "prof"
+
+
+@contextlib.contextmanager
+def profiled(prof_file: Path) -> Iterator[cProfile.Profile]:
+    """cProfile the block and dump the stats to prof_file"""
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield prof
+    finally:
+        prof.disable()
+        prof_file.parent.mkdir(parents=True, exist_ok=True)
+        prof.dump_stats(prof_file)
+
+
+@dataclass
+class MemoryTrace:
+    peak_kb: float = 0.0
+    top: list[tracemalloc.StatisticDiff] = field(default_factory=list)
+
+    def lines(self) -> list[str]:
+        out = []
+        for stat in self.top:
+            frame = stat.traceback[0]
+            file = Path(frame.filename)
+            if file.is_relative_to(ROOT):
+                file = file.relative_to(ROOT)
+            out.append(
+                f"{stat.size_diff / 1024:>10.1f} KiB {stat.count_diff:>8} blocks"
+                f"  {file}:{frame.lineno}"
+            )
+        return out
+
+
+class _PeakSampler(threading.Thread):
+    """Snapshots traced memory whenever it grows past the latest snapshot"""
+
+    def __init__(self, interval: float = 0.002, growth: float = 1.1):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.growth = growth
+        self.size = 0
+        self.snapshot: tracemalloc.Snapshot | None = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            current, _ = tracemalloc.get_traced_memory()
+            if current > self.size * self.growth:
+                self.snapshot = tracemalloc.take_snapshot()
+                self.size = current
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+@contextlib.contextmanager
+def traced_memory(n_top: int = 10) -> Iterator[MemoryTrace]:
+    """
+    Trace allocations in the block, yielding a MemoryTrace that gets the peak
+    and the top allocation sites (as close to the peak as sampled) on exit.
+    """
+    trace = MemoryTrace()
+    tracemalloc.start()
+    start = tracemalloc.take_snapshot()
+    sampler = _PeakSampler()
+    sampler.start()
+    try:
+        yield trace
+    finally:
+        sampler.stop()
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = sampler.snapshot
+        if snapshot is None or current >= sampler.size:
+            snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        ignore = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, threading.__file__),
+            tracemalloc.Filter(False, contextlib.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ]
+        diff = snapshot.filter_traces(ignore).compare_to(
+            start.filter_traces(ignore), "lineno"
+        )
+        trace.peak_kb = peak / 1024
+        trace.top = [s for s in diff if s.size_diff > 0][:n_top]
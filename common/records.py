@@ -0,0 +1,111 @@
+import json
+import os
+import re
+import subprocess
+from datetime import datetime
+from functools import cache
+from hashlib import sha256
+from pathlib import Path
+from sys import argv
+
+import __main__
+
+from .input_parsing import argv_input_file
+
+try:
+    from resource import RUSAGE_SELF, getrusage
+except ImportError:  # Not on Windows
+    getrusage = None  # type: ignore[assignment]
+
+RECORDS_ENV = "AOC_RECORDS"
+RE_PART = re.compile(r"^P(\d+)$")
+
+
+@cache
+def records_file() -> str | None:
+    """JSON-lines sink from `-J <file>`, falling back to $AOC_RECORDS"""
+    if "-J" in argv:
+        next_arg = argv.index("-J") + 1
+        if next_arg >= len(argv):
+            raise SyntaxError("-J must be followed by a filename")
+        return argv[next_arg]
+    return os.environ.get(RECORDS_ENV) or None
+
+
+def main_module() -> str:
+    """Dotted name of the running solution, e.g. '2024.06'"""
+    spec = getattr(__main__, "__spec__", None)
+    if spec is not None:
+        return spec.name
+    return Path(getattr(__main__, "__file__", "?")).stem
+
+
+def year_day(module: str) -> tuple[int | None, int | None]:
+    year, _, day = module.rpartition(".")
+    return (
+        int(year) if year.isdigit() else None,
+        int(day) if day.isdigit() else None,
+    )
+
+
+def peak_rss_kb() -> int | None:
+    if getrusage is None:
+        return None
+    return getrusage(RUSAGE_SELF).ru_maxrss
+
+
+def answer_hash(result: object) -> str:
+    return sha256(str(result).encode()).hexdigest()[:16]
+
+
+def input_name() -> str | None:
+    try:
+        input_file = argv_input_file()
+    except FileNotFoundError:
+        return None
+    return Path(input_file).name if input_file else None
+
+
+@cache
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def emit(
+    label: str, wall_ms: float, cpu_ms: float, result: object = None, **extra: object
+):
+    """Append a record of a labelled call to the JSON-lines sink, if any"""
+    path = records_file()
+    if not path:
+        return
+    module = main_module()
+    year, day = year_day(module)
+    part = RE_PART.match(label)
+    record = {
+        "year": year,
+        "day": day,
+        "part": int(part.group(1)) if part else None,
+        "label": label,
+        "module": module,
+        "input": input_name(),
+        "wall_ms": round(wall_ms, 3),
+        "cpu_ms": round(cpu_ms, 3),
+        "peak_rss_kb": peak_rss_kb(),
+        "result": None if result is None else str(result),
+        "answer_hash": None if result is None else answer_hash(result),
+        "commit": git_commit(),
+        "time": datetime.now().isoformat(timespec="seconds"),
+        **extra,
+    }
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
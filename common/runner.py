@@ -0,0 +1,205 @@
+"""
+Run whole calendars in parallel and tabulate the answers and timings
+
+    python -m common.runner [year|year/day ...] [-j JOBS] [--timeout S] [solution args...]
+
+Any argument that isn't a year or year/day (e.g. -s, -2) is forwarded to every day.
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+
+from .ansi import BRIGHT_BLUE, DIM, ESC, GREEN, ITALIC, MAGENTA, RED, REVERSE, Ansi
+from .records import RECORDS_ENV
+
+ROOT = Path(__file__).parent.parent
+RE_TARGET = re.compile(r"^(20\d\d)(?:[/.](\d\d?))?$")
+ANSWER_WIDTH = 48
+
+
+@dataclass
+class DayRun:
+    module: str
+    args: list[str] = field(default_factory=list)
+    returncode: int = 0
+    wall_ms: float = 0.0
+    records: list[dict] = field(default_factory=list)
+    stderr: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+def discover(targets: list[str]) -> list[str]:
+    """Turn targets like '2024' or '2024/06' into day modules, e.g. '2024.06'"""
+    if not targets:
+        targets = sorted(p.name for p in ROOT.glob("20*") if p.is_dir())
+    modules: list[str] = []
+    for target in targets:
+        m = RE_TARGET.match(target)
+        if m is None:
+            raise ValueError(f"Invalid target {target!r}, expected year or year/day")
+        year, day = m.groups()
+        pattern = f"{int(day):02}.py" if day else "[0-9][0-9].py"
+        modules.extend(f"{year}.{f.stem}" for f in sorted((ROOT / year).glob(pattern)))
+    return modules
+
+
+def run_day(module: str, day_args: list[str], timeout: float | None = None) -> DayRun:
+    """Run one day in a fresh interpreter, collecting its label_call records"""
+    with tempfile.TemporaryDirectory() as tmp:
+        records_file = Path(tmp) / "records.jsonl"
+        env = os.environ | {RECORDS_ENV: str(records_file)}
+        start = perf_counter()
+        try:
+            proc = subprocess.run(
+                [sys.executable, "-m", module, "-r", *day_args],
+                check=False,
+                cwd=ROOT,
+                env=env,
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+            )
+            returncode, stderr = proc.returncode, proc.stderr
+        except subprocess.TimeoutExpired:
+            returncode, stderr = -1, f"timed out after {timeout}s"
+        run = DayRun(module, day_args, returncode, (perf_counter() - start) * 1000)
+        run.stderr = stderr
+        if records_file.exists():
+            run.records = [json.loads(line) for line in records_file.open()]
+    return run
+
+
+def run_all(
+    modules: list[str],
+    day_args: list[str],
+    jobs: int | None = None,
+    timeout: float | None = None,
+) -> list[DayRun]:
+    """Run days concurrently, each in its own process, at most `jobs` at a time"""
+    return run_many([(m, day_args) for m in modules], jobs, timeout)
+
+
+def run_many(
+    days: list[tuple[str, list[str]]],
+    jobs: int | None = None,
+    timeout: float | None = None,
+) -> list[DayRun]:
+    """Like run_all, with arguments per day"""
+    runs: list[DayRun] = []
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        futures = [pool.submit(run_day, m, args, timeout) for m, args in days]
+        for i, future in enumerate(as_completed(futures), 1):
+            run = future.result()
+            runs.append(run)
+            status = Ansi.fmt("✔", [GREEN]) if run.ok else Ansi.fmt("✘", [RED])
+            sys.stderr.write(f"\r[{i:>3}/{len(days)}] {status} {run.module}{ESC}K")
+    sys.stderr.write("\n")
+    return sorted(runs, key=lambda r: r.module)
+
+
+def fmt_ms(t: float) -> str:
+    return f"{t:.2f} ms" if t < 10_000 else f"{t / 1000:.2f}  s"
+
+
+def print_table(runs: list[DayRun], wall_ms: float):
+    print(Ansi.fmt(f"{'day':<8}{'part':<8}{'time':>12}  answer", [REVERSE]))
+    for run in runs:
+        if not run.ok:
+            err = run.stderr.strip().splitlines() or [f"exit code {run.returncode}"]
+            print(Ansi.fmt(f"{run.module:<8}{'✘':<8}{'':>12}  {err[-1]}", [RED]))
+            continue
+        for i, rec in enumerate(run.records):
+            day = run.module if i == 0 else ""
+            answer = rec["result"] or ""
+            if len(answer) > ANSWER_WIDTH:
+                answer = answer[: ANSWER_WIDTH - 1] + "…"
+            codes = [DIM] if rec["result"] is None else [BRIGHT_BLUE]
+            print(
+                f"{day:<8}{rec['label']:<8}",
+                Ansi.fmt(f"{fmt_ms(rec['wall_ms']):>12}", [GREEN]),
+                " " + Ansi.fmt(answer, codes),
+                sep="",
+            )
+
+    n_failed = sum(not r.ok for r in runs)
+    total = sum(r.wall_ms for r in runs)
+    slowest = max(runs, key=lambda r: r.wall_ms)
+    print(
+        Ansi.fmt(
+            f"{len(runs)} days, {n_failed} failed │ wall {fmt_ms(wall_ms)}"
+            f" │ sum {fmt_ms(total)} │ slowest {slowest.module} {fmt_ms(slowest.wall_ms)}",
+            [MAGENTA, ITALIC],
+        )
+    )
+
+
+def run_parser(description: str) -> ArgumentParser:
+    """Parser with the arguments shared by commands that run days"""
+    parser = ArgumentParser(description=description)
+    parser.add_argument("targets", nargs="*", help="years or year/day, default all")
+    parser.add_argument(
+        "--jobs", "-j", type=int, help="(int) parallel days, defaults to cpu count"
+    )
+    parser.add_argument(
+        "--timeout", type=float, help="(float) seconds before a day is killed"
+    )
+    return parser
+
+
+def parse_run_args(
+    parser: ArgumentParser, with_value: tuple[str, ...] = ()
+) -> tuple[Namespace, list[str], list[str]]:
+    """
+    Parse known arguments, returning them with the targets and the arguments
+    to forward to each day (in their original order, e.g. -i <file>).
+    with_value: extra options of `parser` that take a value
+    """
+    args, _ = parser.parse_known_args()
+    targets = [t for t in args.targets if RE_TARGET.match(t)]
+    with_value = ("-j", "--jobs", "--timeout", *with_value)
+    day_args: list[str] = []
+    skip_next = False
+    for arg in sys.argv[1:]:
+        if skip_next:
+            skip_next = False
+        elif arg in with_value:
+            skip_next = True
+        elif not (
+            RE_TARGET.match(arg)
+            or arg.startswith(
+                tuple(o + ("=" if o[1] == "-" else "") for o in with_value)
+            )
+        ):
+            day_args.append(arg)
+    return args, targets, day_args
+
+
+def main():
+    parser = run_parser(__doc__.split("\n")[1])
+    args, targets, day_args = parse_run_args(parser)
+
+    modules = discover(targets)
+    if not modules:
+        print(Ansi.fmt("❌ No days found", [RED]))
+        sys.exit(1)
+
+    start = perf_counter()
+    runs = run_all(modules, day_args, args.jobs, args.timeout)
+    print_table(runs, (perf_counter() - start) * 1000)
+    sys.exit(any(not r.ok for r in runs))
+
+
+if __name__ == "__main__":
+    main()
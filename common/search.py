@@ -0,0 +1,222 @@
+"""
+Shortest path searches over integer-encoded states, e.g. a flat grid index or
+index * 4 + direction. Graphs are given as functions of a state:
+    neighbors(state) -> Iterable[state]             (bfs)
+    edges(state) -> Iterable[(state, weight)]       (dijkstra, dial, zero_one_bfs)
+Paths are kept as parent pointers unless parents=False, all_preds also keeps every
+optimal predecessor so all optimal paths can be recovered with
+SearchResult.optimal_states().
+"""
+
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from heapq import heappop, heappush
+
+Neighbors = Callable[[int], Iterable[int]]
+Edges = Callable[[int], Iterable[tuple[int, int]]]
+Goal = Callable[[int], bool]
+Visit = Callable[[int, int], None]  # (state, cost) when a state is expanded
+
+
+@dataclass
+class SearchResult:
+    dist: dict[int, int] = field(default_factory=dict)
+    parent: dict[int, int] = field(default_factory=dict)
+    preds: dict[int, list[int]] = field(default_factory=dict)  # Only with all_preds
+    ends: list[int] = field(default_factory=list)  # Goal states at the best cost
+
+    @property
+    def end(self) -> int | None:
+        return self.ends[0] if self.ends else None
+
+    @property
+    def cost(self) -> int | None:
+        return None if self.end is None else self.dist[self.end]
+
+    def path(self, end: int | None = None) -> list[int]:
+        """States from a start to end (default: the first goal reached)"""
+        state = self.end if end is None else end
+        if state is None:
+            return []
+        path = [state]
+        while state in self.parent:
+            state = self.parent[state]
+            path.append(state)
+        return path[::-1]
+
+    def optimal_states(self, ends: Iterable[int] | None = None) -> set[int]:
+        """All states on any optimal path to ends (default: all goals reached)"""
+        stack = list(self.ends if ends is None else ends)
+        seen = set(stack)
+        while stack:
+            for p in self.preds.get(stack.pop(), ()):
+                if p not in seen:
+                    seen.add(p)
+                    stack.append(p)
+        return seen
+
+
+def bfs(
+    starts: Iterable[int],
+    neighbors: Neighbors,
+    goal: Goal | None = None,
+    all_preds: bool = False,
+    parents: bool = True,
+    visit: Visit | None = None,
+) -> SearchResult:
+    """Unit weight shortest paths, explores everything reachable without a goal"""
+    res = SearchResult()
+    dist, parent, preds = res.dist, res.parent, res.preds
+    queue = deque(starts)
+    for s in queue:
+        dist[s] = 0
+        if all_preds:
+            preds[s] = []
+    best = -1
+    while queue:
+        s = queue.popleft()
+        cost = dist[s]
+        if best != -1 and cost > best:
+            break
+        if visit is not None:
+            visit(s, cost)
+        if goal is not None and goal(s):
+            best = cost
+            res.ends.append(s)
+            if not all_preds:
+                break
+            continue
+        nc = cost + 1
+        for t in neighbors(s):
+            dt = dist.get(t)
+            if dt is None:
+                dist[t] = nc
+                if parents:
+                    parent[t] = s
+                if all_preds:
+                    preds[t] = [s]
+                queue.append(t)
+            elif all_preds and dt == nc:
+                preds[t].append(s)
+    return res
+
+
+def dijkstra(
+    starts: Iterable[int],
+    edges: Edges,
+    goal: Goal | None = None,
+    heuristic: Callable[[int], int] | None = None,
+    all_preds: bool = False,
+    parents: bool = True,
+    visit: Visit | None = None,
+) -> SearchResult:
+    """
+    Non-negative weight shortest paths, A* with a consistent `heuristic`.
+    With all_preds, searching continues until the best goal cost is exceeded.
+    """
+    res = SearchResult()
+    dist, parent, preds = res.dist, res.parent, res.preds
+    heap: list[tuple[int, int, int]] = []  # f, g, state
+    for s in starts:
+        dist[s] = 0
+        if all_preds:
+            preds[s] = []
+        heappush(heap, (heuristic(s) if heuristic else 0, 0, s))
+    best = -1
+    while heap:
+        f, cost, s = heappop(heap)
+        if cost > dist[s]:
+            continue  # Stale
+        if best != -1 and f > best:
+            break
+        if visit is not None:
+            visit(s, cost)
+        if goal is not None and goal(s):
+            best = cost
+            res.ends.append(s)
+            if not all_preds:
+                break
+            continue
+        for t, w in edges(s):
+            nc = cost + w
+            dt = dist.get(t)
+            if dt is None or nc < dt:
+                dist[t] = nc
+                if parents:
+                    parent[t] = s
+                if all_preds:
+                    preds[t] = [s]
+                heappush(heap, (nc + heuristic(t) if heuristic else nc, nc, t))
+            elif all_preds and nc == dt:
+                preds[t].append(s)
+    return res
+
+
+def dial(
+    starts: Iterable[int],
+    edges: Edges,
+    max_weight: int,
+    goal: Goal | None = None,
+    all_preds: bool = False,
+    parents: bool = True,
+    visit: Visit | None = None,
+) -> SearchResult:
+    """
+    Dijkstra with a bucket queue (Dial's algorithm) for small integer weights
+    in 0..max_weight, a circular list of max_weight + 1 buckets replaces the heap.
+    """
+    res = SearchResult()
+    dist, parent, preds = res.dist, res.parent, res.preds
+    n_buckets = max_weight + 1
+    buckets: list[list[int]] = [[] for _ in range(n_buckets)]
+    for s in starts:
+        dist[s] = 0
+        if all_preds:
+            preds[s] = []
+        buckets[0].append(s)
+    pending = len(buckets[0])
+    cost = 0
+    while pending:
+        bucket = buckets[cost % n_buckets]
+        while bucket:  # Zero weight edges refill the current bucket
+            s = bucket.pop()
+            pending -= 1
+            if dist[s] != cost:
+                continue  # Stale
+            if visit is not None:
+                visit(s, cost)
+            if goal is not None and goal(s):
+                res.ends.append(s)
+                if not all_preds:
+                    return res
+                continue
+            for t, w in edges(s):
+                nc = cost + w
+                dt = dist.get(t)
+                if dt is None or nc < dt:
+                    dist[t] = nc
+                    if parents:
+                        parent[t] = s
+                    if all_preds:
+                        preds[t] = [s]
+                    buckets[nc % n_buckets].append(t)
+                    pending += 1
+                elif all_preds and nc == dt:
+                    preds[t].append(s)
+        if res.ends:
+            break
+        cost += 1
+    return res
+
+
+def zero_one_bfs(
+    starts: Iterable[int],
+    edges: Edges,
+    goal: Goal | None = None,
+    all_preds: bool = False,
+    parents: bool = True,
+    visit: Visit | None = None,
+) -> SearchResult:
+    """Shortest paths with weights 0 or 1"""
+    return dial(starts, edges, 1, goal, all_preds, parents, visit)
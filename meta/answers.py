@@ -0,0 +1,181 @@
+"""
+Check solutions against a registry of known answers
+
+    python -m meta.answers check [year|year/day ...] [--variants VARIANTS]
+    python -m meta.answers record [year|year/day ...] [--variants VARIANTS] [--overwrite]
+
+Variants are input files: personal {day}.txt, s {day}s.txt and e {day}e.txt,
+e.g. `--variants ,s` for personal and short. Days run through common.runner.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+from common.ansi import DIM, GREEN, ITALIC, MAGENTA, RED, REVERSE, Ansi
+from common.runner import (
+    ROOT,
+    DayRun,
+    discover,
+    fmt_ms,
+    parse_run_args,
+    run_many,
+    run_parser,
+)
+
+ANSWERS_FILE = Path(__file__).parent / "answers.json"
+VARIANTS = ("", "s", "e")
+# Inputs that only fit some parts
+VARIANT_ARGS = {("2023.08", "e"): ["-1"]}
+
+Answers = dict[str, dict[str, dict[str, str]]]  # module -> input -> label -> answer
+
+
+def variant_input(module: str, variant: str) -> Path:
+    year, day = module.split(".")
+    return ROOT / year / "inputs" / f"{day}{variant}.txt"
+
+
+def variant_args(module: str, variant: str) -> list[str]:
+    extra = VARIANT_ARGS.get((module, variant), [])
+    if variant == "":
+        return extra
+    if variant == "s":
+        return ["-s", *extra]
+    return ["-i", str(variant_input(module, variant).relative_to(ROOT)), *extra]
+
+
+def load_answers() -> Answers:
+    if not ANSWERS_FILE.exists():
+        return {}
+    return json.loads(ANSWERS_FILE.read_text())
+
+
+def run_variants(
+    modules: list[str],
+    variants: list[str],
+    day_args: list[str],
+    jobs: int | None = None,
+    timeout: float | None = None,
+) -> list[tuple[str, DayRun]]:
+    """Run every day on each of its existing variant inputs"""
+    days: dict[tuple[str, str], list[str]] = {}
+    for module in modules:
+        for variant in variants:
+            input_file = variant_input(module, variant)
+            if input_file.is_file() and input_file.stat().st_size:
+                days[module, input_file.name] = variant_args(module, variant) + day_args
+    runs = run_many([(m, a) for (m, _), a in days.items()], jobs, timeout)
+    by_args = {(m, tuple(a)): name for (m, name), a in days.items()}
+    return sorted(
+        ((by_args[r.module, tuple(r.args)], r) for r in runs),
+        key=lambda ir: (ir[1].module, ir[0]),
+    )
+
+
+def record(runs: list[tuple[str, DayRun]], overwrite: bool) -> int:
+    """Add answers from the runs to the registry, returning the number of conflicts"""
+    answers = load_answers()
+    n_new = n_conflicts = 0
+    for input_name, run in runs:
+        if not run.ok:
+            print(Ansi.fmt(f"✘ {run.module} {input_name} failed, not recorded", [RED]))
+            continue
+        known = answers.setdefault(run.module, {}).setdefault(input_name, {})
+        for rec in run.records:
+            label, result = rec["label"], rec["result"]
+            if result is None:
+                continue
+            if label in known and known[label] != result and not overwrite:
+                n_conflicts += 1
+                print(
+                    Ansi.fmt(
+                        f"⚠ {run.module} {input_name} {label}: got {result},"
+                        f" keeping {known[label]} (use --overwrite)",
+                        [RED],
+                    )
+                )
+                continue
+            n_new += known.get(label) != result
+            known[label] = result
+    answers = {
+        m: {i: answers[m][i] for i in sorted(answers[m]) if answers[m][i]}
+        for m in sorted(answers)
+    }
+    ANSWERS_FILE.write_text(json.dumps(answers, indent=1) + "\n")
+    print(Ansi.fmt(f"✅ Recorded {n_new} new answers in {ANSWERS_FILE}", [GREEN]))
+    return n_conflicts
+
+
+def check(runs: list[tuple[str, DayRun]]) -> int:
+    """Print pass/fail per part with timings, returning the number of failures"""
+    answers = load_answers()
+    print(Ansi.fmt(f"{'day':<8}{'input':<9}{'part':<8}{'time':>12}  ", [REVERSE]))
+    n_failed = 0
+    for input_name, run in runs:
+        head = f"{run.module:<8}{input_name:<9}"
+        if not run.ok:
+            n_failed += 1
+            err = run.stderr.strip().splitlines() or [f"exit code {run.returncode}"]
+            print(Ansi.fmt(f"{head}{'✘':<8}{'':>12}  {err[-1]}", [RED]))
+            continue
+        known = answers.get(run.module, {}).get(input_name, {})
+        for rec in run.records:
+            label, result = rec["label"], rec["result"]
+            if result is None:
+                continue
+            row = f"{head}{label:<8}{fmt_ms(rec['wall_ms']):>12}  "
+            expected = known.get(label)
+            if expected is None:
+                print(Ansi.fmt(row + f"? {result}", [DIM]))
+            elif expected == result:
+                print(Ansi.fmt(row + "✔", [GREEN]))
+            else:
+                n_failed += 1
+                print(Ansi.fmt(row + f"✘ got {result}, expected {expected}", [RED]))
+            head = " " * len(head)
+    return n_failed
+
+
+def main():
+    parser = run_parser(__doc__.split("\n")[1])
+    parser.prog = "python -m meta.answers {check,record}"
+    parser.add_argument(
+        "--variants",
+        default=",".join(VARIANTS),
+        help="(str) comma separated input variants, default all: ',s,e'",
+    )
+    parser.add_argument(
+        "--overwrite", action="store_true", help="(flag) replace recorded answers"
+    )
+    # The command is positional like the targets, so take it out first
+    if len(sys.argv) < 2 or sys.argv[1] not in ("check", "record"):
+        parser.print_help()
+        sys.exit(2)
+    command = sys.argv.pop(1)
+
+    args, targets, day_args = parse_run_args(parser, ("--variants",))
+    day_args = [a for a in day_args if a != "--overwrite"]
+    variants = args.variants.split(",")
+    if invalid := set(variants) - set(VARIANTS):
+        parser.error(f"unknown variants {invalid}, choose from {VARIANTS}")
+
+    modules = discover(targets)
+    runs = run_variants(modules, variants, day_args, args.jobs, args.timeout)
+
+    if command == "record":
+        sys.exit(bool(record(runs, args.overwrite)))
+
+    n_failed = check(runs)
+    n_parts = sum(rec["result"] is not None for _, run in runs for rec in run.records)
+    print(
+        Ansi.fmt(
+            f"{n_failed} failed, {n_parts} parts checked",
+            [RED if n_failed else MAGENTA, ITALIC],
+        )
+    )
+    sys.exit(bool(n_failed))
+
+
+if __name__ == "__main__":
+    main()
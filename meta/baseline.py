@@ -0,0 +1,198 @@
+"""
+Performance regression check against a committed baseline
+
+    python -m meta.baseline save [year|year/day ...] [-n RUNS]
+    python -m meta.baseline compare [year|year/day ...] [-n RUNS] [--threshold PCT]
+
+Each day is run RUNS times through common.runner, per part medians are compared
+with the baseline and parts that are both PCT% slower and outside the noise
+(a few MADs) are flagged.
+"""
+
+import json
+import sys
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from statistics import median
+
+from common.ansi import BRIGHT_BLUE, GREEN, ITALIC, MAGENTA, RED, REVERSE, YELLOW, Ansi
+from common.records import git_commit
+from common.runner import DayRun, discover, fmt_ms, parse_run_args, run_all, run_parser
+
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+
+# A part is only slower if its median moved by more than this many MADs...
+NOISE_MADS = 3
+# ...and by more than this absolute amount, sub-ms parts are all noise
+NOISE_FLOOR_MS = 1.0
+
+
+@dataclass
+class PartStats:
+    median_ms: float
+    mad_ms: float
+    n: int
+    input: str | None
+    answer_hash: str | None
+
+    @classmethod
+    def from_records(cls, records: list[dict]) -> "PartStats":
+        times = [r["wall_ms"] for r in records]
+        med = median(times)
+        return cls(
+            median_ms=round(med, 3),
+            mad_ms=round(median(abs(t - med) for t in times), 3),
+            n=len(times),
+            input=records[0]["input"],
+            answer_hash=records[0]["answer_hash"],
+        )
+
+
+Stats = dict[str, dict[str, PartStats]]  # module -> label -> stats
+
+
+def collect(runs: list[DayRun]) -> tuple[Stats, list[DayRun]]:
+    """Group records of repeated runs into stats per day and label"""
+    grouped: dict[str, dict[str, list[dict]]] = {}
+    failed = []
+    for run in runs:
+        if not run.ok:
+            failed.append(run)
+            continue
+        for rec in run.records:
+            grouped.setdefault(run.module, {}).setdefault(rec["label"], []).append(rec)
+    stats = {
+        module: {label: PartStats.from_records(recs) for label, recs in labels.items()}
+        for module, labels in grouped.items()
+    }
+    return stats, failed
+
+
+def measure(
+    targets: list[str],
+    day_args: list[str],
+    n_runs: int,
+    jobs: int | None = None,
+    timeout: float | None = None,
+) -> tuple[Stats, list[DayRun]]:
+    modules = discover(targets)
+    if not modules:
+        print(Ansi.fmt("❌ No days found", [RED]))
+        sys.exit(1)
+    return collect(run_all(modules * n_runs, day_args, jobs, timeout))
+
+
+def load_baseline() -> dict:
+    if not BASELINE_FILE.exists():
+        return {"meta": {}, "days": {}}
+    return json.loads(BASELINE_FILE.read_text())
+
+
+def save(stats: Stats, n_runs: int):
+    baseline = load_baseline()
+    baseline["meta"] = {
+        "commit": git_commit(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "runs": n_runs,
+    }
+    for module, labels in stats.items():
+        baseline["days"][module] = {
+            label: asdict(part) for label, part in labels.items()
+        }
+    baseline["days"] = dict(sorted(baseline["days"].items()))
+    BASELINE_FILE.write_text(json.dumps(baseline, indent=1) + "\n")
+    print(Ansi.fmt(f"✅ Saved {len(stats)} days to {BASELINE_FILE}", [GREEN]))
+
+
+def is_slower(old: PartStats, new: PartStats, threshold: float) -> bool:
+    delta = new.median_ms - old.median_ms
+    noise = NOISE_MADS * max(old.mad_ms, new.mad_ms)
+    return (
+        new.median_ms > old.median_ms * (1 + threshold / 100)
+        and delta > noise
+        and delta > NOISE_FLOOR_MS
+    )
+
+
+def compare(stats: Stats, threshold: float) -> int:
+    """Print a report and return the number of regressions"""
+    days = load_baseline()["days"]
+    print(
+        Ansi.fmt(
+            f"{'day':<8}{'part':<8}{'baseline':>12}{'now':>12}{'± MAD':>11}{'Δ':>9}  ",
+            [REVERSE],
+        )
+    )
+    n_bad = 0
+    for module, labels in stats.items():
+        for label, new in labels.items():
+            old_dict = days.get(module, {}).get(label)
+            head = f"{module:<8}{label:<8}"
+            if old_dict is None:
+                print(
+                    head + Ansi.fmt(f"{'-':>12}{fmt_ms(new.median_ms):>12}", [ITALIC])
+                )
+                continue
+            old = PartStats(**old_dict)
+            if old.input != new.input:
+                print(head + Ansi.fmt(f"input {new.input} ≠ {old.input}", [ITALIC]))
+                continue
+            change = 100 * (new.median_ms / old.median_ms - 1) if old.median_ms else 0
+            row = (
+                f"{fmt_ms(old.median_ms):>12}{fmt_ms(new.median_ms):>12}"
+                f"{fmt_ms(new.mad_ms):>11}{change:>+8.1f}%  "
+            )
+            if old.answer_hash != new.answer_hash:
+                n_bad += 1
+                print(head + Ansi.fmt(row + "answer changed", [RED]))
+            elif is_slower(old, new, threshold):
+                n_bad += 1
+                print(head + Ansi.fmt(row + "slower", [RED]))
+            elif is_slower(new, old, threshold):
+                print(head + Ansi.fmt(row + "faster", [GREEN]))
+            else:
+                print(head + Ansi.fmt(row, [BRIGHT_BLUE]))
+    return n_bad
+
+
+def main():
+    parser = run_parser(__doc__.split("\n")[1])
+    parser.prog = "python -m meta.baseline {save,compare}"
+    parser.add_argument(
+        "--runs", "-n", type=int, default=5, help="(int) runs per day, default 5"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="(float) percent slower than baseline to flag, default 10",
+    )
+    # The command is positional like the targets, so take it out first
+    if len(sys.argv) < 2 or sys.argv[1] not in ("save", "compare"):
+        parser.print_help()
+        sys.exit(2)
+    command = sys.argv.pop(1)
+
+    args, targets, day_args = parse_run_args(parser, ("-n", "--runs", "--threshold"))
+    stats, failed = measure(targets, day_args, args.runs, args.jobs, args.timeout)
+    for module in sorted({run.module for run in failed}):
+        print(Ansi.fmt(f"✘ {module} failed, not measured", [YELLOW]))
+
+    if command == "save":
+        save(stats, args.runs)
+        sys.exit(bool(failed))
+
+    n_bad = compare(stats, args.threshold)
+    print(
+        Ansi.fmt(
+            f"{n_bad} regressions (>{args.threshold:g}% and >{NOISE_MADS} MAD slower)",
+            [RED if n_bad else MAGENTA, ITALIC],
+        )
+    )
+    sys.exit(bool(n_bad or failed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+from common.cycles import find_cycle
+
+# hash(-1) == hash(-2) in CPython, the states must still differ
+SEQ = [(0, -1), (0, -2), (0, -3), (0, -4)]
+
+
+def step(state):
+    return SEQ[(SEQ.index(state) + 1) % len(SEQ)]
+
+
+def test_hash_collisions_are_not_repeats():
+    for kwargs in ({}, {"brent": True}, {"fingerprint": True}):
+        cycle = find_cycle(step, SEQ[0], **kwargs)
+        assert (cycle.start, cycle.length) == (0, 4), kwargs
+        assert cycle.fast_forward(5) == SEQ[1]
@@ -0,0 +1,25 @@
+from common.search import bfs, dial, dijkstra, zero_one_bfs
+
+# 0 <-> 1 at no cost, 1 -> 2 at cost 1
+EDGES = {0: [(1, 0)], 1: [(0, 0), (2, 1)], 2: []}
+
+
+def test_zero_weight_edge_into_start():
+    for search in (dijkstra, zero_one_bfs):
+        res = search([0], EDGES.__getitem__, goal=lambda s: s == 2, all_preds=True)
+        assert res.cost == 1
+        assert res.optimal_states() == {0, 1, 2}
+    res = dial([0], EDGES.__getitem__, 1, goal=lambda s: s == 2, all_preds=True)
+    assert res.optimal_states() == {0, 1, 2}
+
+
+def test_start_reaching_start_at_no_cost():
+    res = dijkstra([0, 1], EDGES.__getitem__, goal=lambda s: s == 2, all_preds=True)
+    assert res.cost == 1
+    assert res.preds[0] == [1] and res.preds[1] == [0]
+
+
+def test_bfs_preds_of_starts():
+    res = bfs([0, 1], lambda s: [t for t, _ in EDGES[s]], all_preds=True)
+    assert res.preds[0] == [] and res.preds[1] == []
+    assert res.preds[2] == [1]